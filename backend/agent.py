@@ -1,27 +1,44 @@
 """Dedalus ADK agent orchestration for contract analysis.
 
 Uses Dedalus as the primary AI orchestrator with:
-- Native Python tools (risk computation, date extraction) registered via ADK
+- Deterministic tools (risk computation, date extraction) run up front and
+  fed to the agent in its prompt
 - MCP server (Exa) via DAuth-secured connections for legal research
 - Non-linear multi-step reasoning (agent decides tool usage dynamically)
 
-Clause-level analysis uses direct K2+RAG for speed (6-concurrent parallelism),
+Clause-level analysis uses direct K2+RAG for speed (bounded parallelism),
 while Dedalus owns the intelligence layer for summary generation, tool
 orchestration, and cross-clause reasoning.
 """
 
 import asyncio
-import json
+import atexit
+import hashlib
+import logging
+import math
 import os
+import queue
+import re
 import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+import orjson
+import xxhash
 from convex import ConvexClient
-from dedalus_labs import AsyncDedalus, DedalusRunner
+from dedalus_labs import DedalusRunner
 from dotenv import load_dotenv
+from openai import RateLimitError
 
-from k2_client import analyze_clause_risk
+from http_clients import dedalus, k2
+from k2_client import analyze_clause_risk, analyze_clauses_batch
+from k2_client import prune_cache as prune_analysis_cache
+from llm_json import parse_llm_json
 from prompts import AGENT_SYSTEM_PROMPT
+from rag_cache import cached_query
+from rag_cache import warm as warm_rag_cache
+from semantic_cache import SemanticCache
 from tools import (
     categorize_risk,
     classify_contract,
@@ -32,65 +49,411 @@ from tools import (
     find_key_dates,
     match_clauses_to_ocr_boxes,
 )
-from vultr_rag import query_legal_knowledge
+from triage import has_risk_markers, predict_low_risk
 
 load_dotenv(Path(__file__).parent / ".env")
 
-# Dedalus client — primary orchestrator for summary generation.
-# MCP servers (Exa) use Dedalus Auth (DAuth) — OAuth 2.1 credentials are
-# managed securely by the Dedalus platform (intent-based, zero-trust).
-# No third-party API keys are stored in this application.
-client = AsyncDedalus(
-    api_key=os.environ.get("DEDALUS_API_KEY", ""),
-    timeout=120.0,
-)
+# Progress logging goes through a queue so emitting a line never blocks the
+# event loop on stdout; a background listener thread does the actual writes.
+logger = logging.getLogger("contractpilot.agent")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue: queue.Queue = queue.Queue(-1)
+logger.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Dedalus is the primary orchestrator for summary generation.
+# One runner for every summary. Runs are independent and only ever started
+# from the event loop, so sharing it across reviews is safe.
+runner = DedalusRunner(dedalus)
 
 # Convex client for writing results
 convex = ConvexClient(os.environ.get("CONVEX_URL", ""))
 
 
-CLAUSE_CONCURRENCY = 6  # Max concurrent K2+RAG calls (raised for sub-clauses)
+async def _amutation(name: str, payload: dict):
+    """Run a (synchronous) Convex mutation off the event loop."""
+    return await asyncio.to_thread(convex.mutation, name, payload)
 
 
-async def _analyze_one_clause(
-    clause: dict, contract_type: str, index: int
-) -> dict:
-    """Analyze a single clause: RAG lookup then K2 Think. Runs concurrently."""
-    clause_text = clause["text"]
-    heading = clause["heading"]
-    t0 = time.time()
+async def _mark_failed(review_id: str) -> None:
+    """Best-effort: flag a review as failed in Convex.
 
-    # Step 1: RAG lookup for legal context
+    The write is shielded so a second cancellation can't abort it halfway;
+    errors are ignored since the caller is already failing.
+    """
     try:
-        rag_context = await query_legal_knowledge(clause_text, heading)
+        await asyncio.shield(
+            _amutation("reviews:updateStatus", {"id": review_id, "status": "failed"})
+        )
+    except (Exception, asyncio.CancelledError):
+        pass
+
+
+class AdmissionController:
+    """Concurrency limit that can be resized while requests are in flight.
+
+    Behaves like an ``asyncio.Semaphore`` but keeps the cap as a plain
+    attribute guarded by a Condition, so ``set_max`` can shrink or grow it
+    without poking ``Semaphore._value``. Shrinking never preempts running
+    work: holders finish normally and new entrants wait until the active
+    count drops below the new cap.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.max_concurrent)
+            self.active += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify(1)
+
+    async def set_max(self, n: int) -> None:
+        """Change the cap; waiters are woken if it went up."""
+        async with self._cond:
+            raised = n > self.max_concurrent
+            self.max_concurrent = max(1, n)
+            if raised:
+                self._cond.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.release()
+
+
+# K2 and RAG have different rate limits and latencies, so each gets its own
+# limit — a slow K2 call never holds a RAG slot (and vice versa).
+K2_CONCURRENCY = int(os.environ.get("K2_CONCURRENCY", 8))
+RAG_CONCURRENCY = int(os.environ.get("RAG_CONCURRENCY", 16))
+k2_admission = AdmissionController(K2_CONCURRENCY)
+rag_admission = AdmissionController(RAG_CONCURRENCY)
+
+# Run RAG and K2 side by side; K2 is re-run with RAG context only for
+# high-risk or unparseable answers. Off by default until quality is checked.
+PARALLEL_RAG_K2 = os.environ.get("PARALLEL_RAG_K2", "").lower() in ("1", "true", "yes")
+
+# Concurrent clause analyses are coalesced into multi-clause K2 requests of up
+# to K2_BATCH_SIZE clauses (1 disables batching), waiting at most
+# K2_BATCH_WINDOW seconds for a batch to fill.
+K2_BATCH_SIZE = int(os.environ.get("K2_BATCH_SIZE", 6))
+K2_BATCH_WINDOW = 0.1  # seconds
+
+# Boilerplate clauses triaged as low-risk above this confidence skip RAG + K2
+TRIAGE_CONFIDENCE = 0.9
+
+# Idle K2 connections are pinged this often so keep-alive stays hot
+K2_KEEPALIVE_INTERVAL = 240.0  # seconds
+
+# Per-clause input caps (chars): ~1500 tokens to K2, a short prefix to RAG
+K2_INPUT_CHARS = 6000
+RAG_INPUT_CHARS = 2000
+
+# Analyzed clauses are written to Convex in batches (see ConvexBatcher)
+CONVEX_BATCH_SIZE = 8
+CONVEX_FLUSH_INTERVAL = 0.5  # seconds
+
+# Phase 1 results (contract type, clauses, positions) keyed by document hash,
+# so retries and re-uploads of the same file skip classification/extraction.
+PHASE1_CACHE_SIZE = 64
+_phase1_cache: OrderedDict[str, tuple[str, list[dict], list[dict]]] = OrderedDict()
+
+# Phase 3 starts once this fraction of clauses is analyzed, after giving the
+# remaining ones up to SUMMARY_TAIL_WAIT seconds to finish.
+SUMMARY_START_FRACTION = 0.8
+SUMMARY_TAIL_WAIT = 5.0  # seconds
+# K2 is raced against Dedalus if the agent hasn't answered within this delay
+SUMMARY_HEDGE_DELAY = 8.0  # seconds
+# Contracts this small with no high-risk clause are summarized locally
+SUMMARY_LOCAL_MAX_CLAUSES = 3
+
+# Summary cache: exact prompt hash only. A near-duplicate match would hand one
+# contract another's summary, dates and amounts included.
+# Bump the version tag to invalidate every cached summary.
+SUMMARY_CACHE_VERSION = "v2"
+SUMMARY_CACHE_TTL = 30 * 24 * 3600  # seconds
+_summary_cache = SemanticCache("summaries", ttl=SUMMARY_CACHE_TTL)
+
+
+def prune_caches() -> None:
+    """Delete expired summaries and clause analyses (blocking; run in a thread)."""
+    _summary_cache.prune()
+    prune_analysis_cache()
+
+
+async def warm_up() -> None:
+    """Open the K2 connection pool and local caches ahead of the first review."""
+    try:
+        await k2.models.list()
+    except Exception as e:
+        logger.warning(f"K2 warmup failed: {e}")
+    try:
+        _summary_cache.warm()
+        warm_rag_cache()
+    except Exception as e:
+        logger.warning(f"Cache warmup failed: {e}")
+
+
+async def keep_warm() -> None:
+    """Background task: warm up now, then ping K2 periodically to keep it hot."""
+    while True:
+        await warm_up()
+        await asyncio.sleep(K2_KEEPALIVE_INTERVAL)
+
+
+def _elapsed_ms(start_ns: int) -> int:
+    """Milliseconds since a ``time.perf_counter_ns()`` reading."""
+    return (time.perf_counter_ns() - start_ns) // 1_000_000
+
+
+async def _rag_lookup(
+    clause_text: str,
+    heading: str,
+    index: int,
+) -> tuple[str, int]:
+    """RAG lookup for legal context. Returns (context, elapsed ms)."""
+    t_rag = time.perf_counter_ns()
+    try:
+        async with rag_admission:
+            rag_context = await cached_query(clause_text, heading)
     except Exception as e:
         rag_context = f"RAG unavailable: {e}"
-        print(f"  Clause {index+1} RAG failed: {e}")
+        logger.warning(f"  Clause {index+1} RAG failed: {e}")
+    return rag_context, _elapsed_ms(t_rag)
+
 
-    # Step 2: K2 Think deep analysis (with RAG context)
+async def _with_k2_admission(call):
+    """Await ``call()`` under the K2 cap, adapting the cap to rate limits (AIMD)."""
     try:
-        k2_result = await analyze_clause_risk(
-            clause_text=clause_text,
-            clause_type=heading,
-            contract_type=contract_type,
-            additional_context=rag_context,
-        )
+        async with k2_admission:
+            result = await call()
+    except RateLimitError:
+        # K2 is pushing back — halve concurrency (multiplicative decrease)
+        await k2_admission.set_max(k2_admission.max_concurrent // 2)
+        raise
+    # Recover one slot per success after backing off (additive increase)
+    if k2_admission.max_concurrent < K2_CONCURRENCY:
+        await k2_admission.set_max(k2_admission.max_concurrent + 1)
+    return result
+
+
+class K2Batcher:
+    """Coalesce concurrent clause analyses into multi-clause K2 requests.
+
+    Callers await ``analyze`` as if it were a single-clause call. Requests for
+    the same contract type are buffered until ``batch_size`` are waiting or
+    ``window`` seconds have passed since the first, then sent together via
+    analyze_clauses_batch under one K2 admission slot. If a batch reply is
+    malformed, its clauses are retried one by one.
+    """
+
+    def __init__(self, batch_size: int = K2_BATCH_SIZE, window: float = K2_BATCH_WINDOW):
+        self.batch_size = batch_size
+        self.window = window
+        self._pending: dict[str, list[tuple[tuple[str, str, str], asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def analyze(
+        self, clause_text: str, clause_type: str, contract_type: str, context: str
+    ) -> dict:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        batch = self._pending.setdefault(contract_type, [])
+        batch.append(((clause_text, clause_type, context), fut))
+        if len(batch) >= self.batch_size:
+            self._flush(contract_type)
+        elif len(batch) == 1:
+            self._timers[contract_type] = loop.call_later(
+                self.window, self._flush, contract_type
+            )
+        return await fut
+
+    def _flush(self, contract_type: str) -> None:
+        timer = self._timers.pop(contract_type, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(contract_type, None)
+        if batch:
+            task = asyncio.create_task(self._send(contract_type, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+        self, contract_type: str, batch: list[tuple[tuple[str, str, str], asyncio.Future]]
+    ) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await _with_k2_admission(
+                lambda: analyze_clauses_batch(items, contract_type)
+            )
+        except RateLimitError as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        except Exception as e:
+            logger.warning(f"  Batched K2 call for {len(batch)} clauses failed ({e}), "
+                           "analyzing individually")
+            await asyncio.gather(*(self._send_one(contract_type, item, fut)
+                                   for item, fut in batch))
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def _send_one(
+        self, contract_type: str, item: tuple[str, str, str], fut: asyncio.Future
+    ) -> None:
+        clause_text, clause_type, context = item
+        try:
+            result = await _with_k2_admission(
+                lambda: analyze_clause_risk(clause_text, clause_type, contract_type, context)
+            )
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+            return
+        if not fut.done():
+            fut.set_result(result)
+
+
+_k2_batcher = K2Batcher()
+
+
+async def _k2_analysis(
+    clause_text: str,
+    full_length: int,
+    heading: str,
+    contract_type: str,
+    rag_context: str,
+    index: int,
+) -> tuple[dict, int]:
+    """K2 Think risk analysis of a (trimmed) clause. Returns (result, elapsed ms)."""
+    t_k2 = time.perf_counter_ns()
+    try:
+        if K2_BATCH_SIZE > 1:
+            k2_result = await _k2_batcher.analyze(clause_text, heading, contract_type, rag_context)
+        else:
+            k2_result = await _with_k2_admission(lambda: analyze_clause_risk(
+                clause_text=clause_text,
+                clause_type=heading,
+                contract_type=contract_type,
+                additional_context=rag_context,
+            ))
     except Exception as e:
-        print(f"  Clause {index+1} K2 failed: {e}")
+        logger.warning(f"  Clause {index+1} K2 failed: {e}")
+        truncated = (
+            f" (first {K2_INPUT_CHARS} of {full_length} chars sent)"
+            if full_length > K2_INPUT_CHARS else ""
+        )
         k2_result = {
             "riskLevel": "medium",
             "riskCategory": "operational",
-            "explanation": f"Analysis timed out for: {heading}",
+            "explanation": f"Analysis timed out for: {heading}{truncated}",
             "concern": "Could not complete deep analysis",
             "suggestion": "Manual review recommended",
             "reasoning": str(e),
         }
+    return k2_result, _elapsed_ms(t_k2)
+
+
+def _needs_grounding(k2_result: dict) -> bool:
+    """Whether an ungrounded K2 answer should be redone with RAG context."""
+    return (
+        k2_result.get("riskLevel") == "high"
+        or k2_result.get("concern") == "Could not parse structured analysis"
+    )
+
+
+async def _analyze_one_clause(
+    clause: dict,
+    contract_type: str,
+    index: int,
+    text_lower: str | None = None,
+) -> dict:
+    """Analyze a single clause: RAG lookup (cached) then K2 Think. Runs concurrently."""
+    clause_text = clause["text"]
+    heading = clause["heading"]
+    t0 = time.perf_counter_ns()
+
+    # Cap model inputs: prefill latency scales with prompt length, and the
+    # head of a clause carries what risk classification needs.
+    clause_text_k2 = clause_text[:K2_INPUT_CHARS]
+    clause_text_rag = clause_text[:RAG_INPUT_CHARS]
+
+    # Step 0: local triage — routine boilerplate doesn't need a K2 call. It
+    # still gets its legal-context lookup, and goes on to the full analysis
+    # if that context flags risk or the lookup failed.
+    rag_context = None
+    is_low, confidence = predict_low_risk(heading, clause_text)
+    if is_low and confidence > TRIAGE_CONFIDENCE:
+        rag_context, rag_ms = await _rag_lookup(clause_text_rag, heading, index)
+        if not rag_context.startswith("RAG unavailable") and not has_risk_markers(rag_context):
+            risk_cat = categorize_risk(clause_text, heading, text_lower)
+            logger.info(f"  Clause {index+1} ({heading[:40]}) triaged as routine, skipping K2")
+            return {
+                "clauseText": clause_text[:2000],
+                "clauseType": heading,
+                "riskLevel": "low",
+                "riskCategory": risk_cat["category"],
+                "explanation": f"Routine {heading} clause; low concern.",
+                "concern": "",
+                "suggestion": "No changes needed",
+                "k2Reasoning": (
+                    "Skipped deep analysis: standard boilerplate with no risk flagged "
+                    f"by legal context (triage confidence {confidence:.2f})"
+                ),
+                "parentHeading": clause.get("parentHeading"),
+                "subClauseIndex": clause.get("subClauseIndex"),
+                "timings": {"rag_ms": rag_ms, "k2_ms": 0, "total_ms": _elapsed_ms(t0)},
+            }
+        logger.info(f"  Clause {index+1} ({heading[:40]}) looked routine, analyzing anyway")
+
+    if rag_context is not None:
+        # Triage already fetched the legal context — go straight to K2
+        k2_result, k2_ms = await _k2_analysis(
+            clause_text_k2, len(clause_text), heading, contract_type, rag_context, index,
+        )
+    elif PARALLEL_RAG_K2:
+        # Steps 1+2 in parallel: K2 answers from the clause alone while RAG
+        # runs; only answers that need grounding pay for a second K2 call.
+        (rag_context, rag_ms), (k2_result, k2_ms) = await asyncio.gather(
+            _rag_lookup(clause_text_rag, heading, index),
+            _k2_analysis(clause_text_k2, len(clause_text), heading, contract_type, "", index),
+        )
+        if _needs_grounding(k2_result):
+            k2_result, retry_ms = await _k2_analysis(
+                clause_text_k2, len(clause_text), heading, contract_type, rag_context, index,
+            )
+            k2_ms += retry_ms
+    else:
+        # Step 1: RAG lookup for legal context
+        rag_context, rag_ms = await _rag_lookup(clause_text_rag, heading, index)
+        # Step 2: K2 Think deep analysis (with RAG context)
+        k2_result, k2_ms = await _k2_analysis(
+            clause_text_k2, len(clause_text), heading, contract_type, rag_context, index,
+        )
 
     # Step 3: Categorize risk (local, instant)
-    risk_cat = categorize_risk(clause_text, heading)
+    risk_cat = categorize_risk(clause_text, heading, text_lower)
 
-    elapsed = time.time() - t0
-    print(f"  Clause {index+1} ({heading[:40]}) done in {elapsed:.1f}s")
+    timings = {"rag_ms": rag_ms, "k2_ms": k2_ms, "total_ms": _elapsed_ms(t0)}
+    logger.info(
+        f"  Clause {index+1} ({heading[:40]}) done in {timings['total_ms']}ms "
+        f"(RAG {rag_ms}ms, K2 {k2_ms}ms)"
+    )
 
     return {
         "clauseText": clause_text[:2000],
@@ -103,109 +466,278 @@ async def _analyze_one_clause(
         "k2Reasoning": k2_result.get("reasoning", ""),
         "parentHeading": clause.get("parentHeading"),
         "subClauseIndex": clause.get("subClauseIndex"),
+        "timings": timings,
     }
 
 
+_WS_RE = re.compile(r"\s+")
+
+
+def _dedup_key(heading: str, text_lower: str) -> str:
+    """Hash of a clause's heading + full normalized text, for exact repeats in a contract."""
+    normalized = _WS_RE.sub(" ", text_lower).strip()
+    return hashlib.md5(f"{heading.strip().lower()}\0{normalized}".encode()).hexdigest()
+
+
+class ConvexBatcher:
+    """Buffer analyzed clauses and write them to Convex in batches.
+
+    Clauses are flushed via clauses:addClauseBatch every CONVEX_BATCH_SIZE
+    clauses or CONVEX_FLUSH_INTERVAL seconds after the first buffered one,
+    whichever comes first. Review progress rides along in the same mutation,
+    so a contract costs ~N/K round trips instead of 2N.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        review_id: str,
+        batch_size: int = CONVEX_BATCH_SIZE,
+        flush_interval: float = CONVEX_FLUSH_INTERVAL,
+    ):
+        self.review_id = review_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.completed = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def add(self, clause: dict) -> None:
+        await self._queue.put(clause)
+
+    async def drain(self) -> None:
+        """Flush everything buffered and stop the background task."""
+        if self._task is None:
+            return
+        await self._queue.put(self._STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        pending: list[dict] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if pending else None
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self.flush(pending)
+                pending = []
+                continue
+            if item is self._STOP:
+                break
+            if not pending:
+                deadline = loop.time() + self.flush_interval
+            pending.append(item)
+            if len(pending) >= self.batch_size:
+                await self.flush(pending)
+                pending = []
+        await self.flush(pending)
+
+    async def flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        self.completed += len(batch)
+        try:
+            await _amutation("clauses:addClauseBatch", {
+                "reviewId": self.review_id,
+                "clauses": [_clause_payload(c) for c in batch],
+                "completedClauses": self.completed,
+            })
+        except Exception as e:
+            logger.warning(f"  Batch save of {len(batch)} clauses failed ({e}), saving individually")
+            for clause in batch:
+                try:
+                    await _save_one_clause(self.review_id, clause)
+                except Exception as e:
+                    logger.warning(f"  Failed to save clause ({clause.get('clauseType')}): {e}")
+
+
 async def _analyze_one_clause_throttled(
-    sem: asyncio.Semaphore,
     clause: dict,
     contract_type: str,
     index: int,
     position: dict | None,
-    review_id: str,
+    batcher: ConvexBatcher,
     counter: dict,
     total: int,
+    shared_analyses: dict[str, asyncio.Task],
 ) -> dict:
-    """Analyze a clause with semaphore throttling and incremental save."""
-    async with sem:
-        result = await _analyze_one_clause(clause, contract_type, index)
+    """Analyze a clause (K2/RAG throttled internally) and queue it for saving.
+
+    Clauses whose normalized text matches an earlier clause in the same
+    contract reuse that clause's analysis instead of calling K2 again.
+    """
+    # Lowercased once here; dedup and risk categorization both use it
+    text_lower = clause["text"].lower()
+    key = _dedup_key(clause["heading"], text_lower)
+    analysis = shared_analyses.get(key)
+    if analysis is None:
+        analysis = asyncio.create_task(
+            _analyze_one_clause(clause, contract_type, index, text_lower)
+        )
+        shared_analyses[key] = analysis
+        reused = False
+    else:
+        logger.info(f"  Clause {index+1} duplicates an earlier clause, reusing its analysis")
+        reused = True
+    result = {
+        **await analysis,
+        "clauseText": clause["text"][:2000],
+        "clauseType": clause["heading"],
+        "parentHeading": clause.get("parentHeading"),
+        "subClauseIndex": clause.get("subClauseIndex"),
+    }
+    if reused:
+        # No RAG/K2 work was done for this copy
+        result["timings"] = {"rag_ms": 0, "k2_ms": 0, "total_ms": 0}
 
     # Merge position data
     if position:
         result["pageNumber"] = position.get("pageNumber", 0)
-        result["rects"] = json.dumps(position.get("rects", []))
+        result["rects"] = orjson.dumps(position.get("rects", [])).decode()
         result["pageWidth"] = position.get("pageWidth", 612)
         result["pageHeight"] = position.get("pageHeight", 792)
 
-    # Save clause to Convex immediately
-    try:
-        _save_one_clause(review_id, result)
-    except Exception as e:
-        print(f"  Warning: Failed to save clause {index+1}: {e}")
+    # Queue for the next batched Convex write (also carries progress)
+    await batcher.add(result)
 
-    # Update progress counter
     counter["completed"] += 1
-    try:
-        convex.mutation("reviews:updateProgress", {
-            "id": review_id,
-            "completedClauses": counter["completed"],
-        })
-    except Exception:
-        pass
-
-    print(f"  Progress: {counter['completed']}/{total}")
+    logger.info(f"  Progress: {counter['completed']}/{total}")
     return result
 
 
+_SUMMARY_PROMPT_TAIL = (
+    "4. Synthesize everything into:\n"
+    "   - A 2-3 sentence executive summary in plain English (no jargon)\n"
+    "   - Overall risk score (0-100) and category scores from the breakdown\n"
+    "   - 3-5 prioritized action items (what the signer should do)\n"
+    "   - The precomputed key dates\n\n"
+    "Respond ONLY with valid JSON, no markdown:\n"
+    '{"summary": "...", "riskScore": N, "financialRisk": N, '
+    '"complianceRisk": N, "operationalRisk": N, "reputationalRisk": N, '
+    '"actionItems": ["..."], "keyDates": [{"date": "...", "label": "...", "type": "deadline|renewal|termination|milestone"}]}'
+)
+
+
+def _risk_breakdown_json(clause_results: list[dict]) -> str:
+    """compute_risk_breakdown over clause results (it only reads level + category)."""
+    clause_json = orjson.dumps([
+        {"riskLevel": c["riskLevel"], "riskCategory": c["riskCategory"]}
+        for c in clause_results
+    ]).decode()
+    return compute_risk_breakdown(clause_json)
+
+
+_SCORE_FIELDS = ("riskScore", "financialRisk", "complianceRisk", "operationalRisk", "reputationalRisk")
+# Late clauses only add action items while the list is shorter than this
+MAX_ACTION_ITEMS = 8
+
+
+def _reconcile_summary(summary: dict, clause_results: list[dict], late: list[int]) -> dict:
+    """Fold clauses that finished after the summary started back into it.
+
+    Scores are recomputed locally over every clause (the summary prompt takes
+    them from the same breakdown), and late medium/high-risk clauses add
+    their suggestions to the action items.
+    """
+    if not late:
+        return summary
+    breakdown = orjson.loads(_risk_breakdown_json(clause_results))
+    summary = {**summary, **{field: breakdown[field] for field in _SCORE_FIELDS}}
+    action_items = list(summary.get("actionItems") or [])
+    for i in late:
+        c = clause_results[i]
+        if c.get("riskLevel") in ("high", "medium") and len(action_items) < MAX_ACTION_ITEMS:
+            item = c.get("suggestion", "Review this clause")
+            if item not in action_items:
+                action_items.append(item)
+    summary["actionItems"] = action_items
+    return summary
+
+
 def _build_summary_prompt(
     contract_type: str,
     clause_results: list[dict],
-    contract_text_preview: str,
+    key_dates: list[dict],
 ) -> str:
     """Build the summary prompt for the Dedalus agent (and K2 fallback).
 
-    The prompt includes clause analysis data in JSON so the agent can pass it
-    to compute_risk_breakdown(), and contract text for find_key_dates().
+    The risk breakdown and key dates are deterministic, so they are computed
+    locally and embedded in the prompt rather than left for the agent to
+    fetch through tool calls (each one an extra LLM round trip). No raw
+    contract text is included — nothing in the prompt needs it.
     """
-    clause_summary = ""
-    for i, c in enumerate(clause_results):
-        clause_summary += (
-            f"\n{i+1}. [{c['riskLevel'].upper()}] {c['clauseType']}: "
-            f"{c['explanation'][:200]}"
-        )
-
-    # Include clause results as JSON so the agent can feed it to tools
-    clause_json = json.dumps([
-        {"riskLevel": c["riskLevel"], "riskCategory": c["riskCategory"],
-         "clauseType": c["clauseType"]}
-        for c in clause_results
+    clause_summary = "".join([
+        f"\n{i+1}. [{c['riskLevel'].upper()}] {c['clauseType']}: {c['explanation'][:200]}"
+        for i, c in enumerate(clause_results)
     ])
 
+    breakdown = _risk_breakdown_json(clause_results)
+
     return (
         f"Contract type: {contract_type}\n\n"
         f"Analyzed clauses:{clause_summary}\n\n"
-        f"Clause data (JSON for tools):\n{clause_json}\n\n"
-        f"Contract preview (first 3000 chars):\n{contract_text_preview[:3000]}\n\n"
+        f"Precomputed risk breakdown:\n{breakdown}\n\n"
+        f"Precomputed key dates:\n{orjson.dumps(key_dates).decode()}\n\n"
         f"Instructions:\n"
-        f"1. Use compute_risk_breakdown with the clause data JSON above to get precise risk scores.\n"
-        f"2. Use find_key_dates with the contract preview to extract important dates.\n"
+        f"1. Take the overall and category risk scores from the precomputed risk breakdown.\n"
+        f"2. Take the key dates from the precomputed key dates.\n"
         f"3. Optionally search for legal standards relevant to this {contract_type} via Exa.\n"
-        f"4. Synthesize everything into:\n"
-        f"   - A 2-3 sentence executive summary in plain English (no jargon)\n"
-        f"   - Overall risk score (0-100) and category scores from the tool\n"
-        f"   - 3-5 prioritized action items (what the signer should do)\n"
-        f"   - Key dates from the tool output\n\n"
-        f"Respond ONLY with valid JSON, no markdown:\n"
-        f'{{"summary": "...", "riskScore": N, "financialRisk": N, '
-        f'"complianceRisk": N, "operationalRisk": N, "reputationalRisk": N, '
-        f'"actionItems": ["..."], "keyDates": [{{"date": "...", "label": "...", "type": "deadline|renewal|termination|milestone"}}]}}'
+        f"{_SUMMARY_PROMPT_TAIL}"
     )
 
 
-def _parse_llm_json(output: str) -> dict:
-    """Parse JSON from an LLM response, stripping code fences if present."""
-    if "```json" in output:
-        output = output.split("```json")[1].split("```")[0]
-    elif "```" in output:
-        output = output.split("```")[1].split("```")[0]
-    return json.loads(output.strip())
+async def _stream_k2_summary(prompt: str) -> str:
+    """Stream the K2 summary reply, bailing out as soon as it can't be JSON.
+
+    Tokens are collected as they arrive; if the first non-whitespace output
+    is neither ``{`` nor a code fence the stream is closed immediately
+    instead of waiting out the full 1024-token response.
+    """
+    stream = await k2.chat.completions.create(
+        model="kimi-k2-instruct",
+        messages=[
+            {"role": "system", "content": "You are ContractPilot. Respond ONLY with valid JSON."},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=1024,
+        stream=True,
+    )
+    parts: list[str] = []
+    checked = False
+    async for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        parts.append(chunk.choices[0].delta.content)
+        if not checked:
+            head = "".join(parts).lstrip()
+            if head:
+                if head[0] not in "{`":
+                    await stream.close()
+                    raise ValueError(f"K2 summary is not JSON: {head[:80]!r}")
+                checked = True
+    return "".join(parts)
+
+
+_RISK_LEVEL_SCORES = {"high": 80, "medium": 50, "low": 20}
 
 
 def _local_fallback_summary(contract_type: str, clause_results: list[dict]) -> dict:
     """Compute summary locally from clause results (no LLM, instant)."""
-    risk_levels = {"high": 80, "medium": 50, "low": 20}
-    scores = [risk_levels.get(c.get("riskLevel", "medium"), 50) for c in clause_results]
-    avg = int(sum(scores) / len(scores)) if scores else 50
+    total = 0
+    action_items: list[str] = []
+    for c in clause_results:
+        level = c.get("riskLevel", "medium")
+        total += _RISK_LEVEL_SCORES.get(level, 50)
+        if level in ("high", "medium") and len(action_items) < 5:
+            action_items.append(c.get("suggestion", "Review this clause"))
+    avg = int(total / len(clause_results)) if clause_results else 50
     return {
         "summary": f"This {contract_type} contains {len(clause_results)} clauses requiring attention.",
         "riskScore": avg,
@@ -213,81 +745,165 @@ def _local_fallback_summary(contract_type: str, clause_results: list[dict]) -> d
         "complianceRisk": avg,
         "operationalRisk": avg,
         "reputationalRisk": avg,
-        "actionItems": [
-            c.get("suggestion", "Review this clause")
-            for c in clause_results
-            if c.get("riskLevel") in ("high", "medium")
-        ][:5] or ["Review the full contract with a lawyer"],
+        "actionItems": action_items or ["Review the full contract with a lawyer"],
         "keyDates": [],
     }
 
 
+async def _dedalus_summary(prompt: str) -> dict:
+    """Summary via the Dedalus agent (Exa MCP), capped at 60s.
+
+    The prompt already carries the risk breakdown and key dates, so the
+    agent goes straight to synthesis, optionally using Exa MCP (via DAuth)
+    to research legal standards and precedents first.
+    """
+    response = await asyncio.wait_for(
+        runner.run(
+            model="anthropic/claude-sonnet-4-5",
+            input=prompt,
+            instructions=AGENT_SYSTEM_PROMPT,
+            mcp_servers=["exa-labs/exa-mcp-server"],
+            max_steps=5,
+            stream=False,
+        ),
+        timeout=60.0,
+    )
+    return parse_llm_json(getattr(response, "final_output", "") or "")
+
+
+async def _k2_summary(prompt: str) -> dict:
+    """Summary via K2 Think on Vultr (direct LLM, no tools)."""
+    return parse_llm_json(await _stream_k2_summary(prompt) or "{}")
+
+
 async def _generate_summary(
     contract_type: str,
     clause_results: list[dict],
-    contract_text_preview: str,
+    key_dates: list[dict],
 ) -> dict:
     """Generate summary + action items + key dates via Dedalus agent.
 
-    Dedalus is the primary orchestrator with native tools (compute_risk_breakdown,
-    find_key_dates) and MCP server (Exa) for legal research. The agent dynamically
-    decides which tools to invoke based on the analysis context — genuine non-linear
-    multi-step reasoning.
+    Dedalus is the primary orchestrator, with the MCP server (Exa) for legal
+    research. compute_risk_breakdown and find_key_dates run locally up front
+    and their output is embedded in the prompt, so the agent's steps go to
+    research and synthesis rather than deterministic tool calls.
 
-    Falls back to K2 Think, then local computation.
+    K2 Think is raced against the agent if it hasn't answered within
+    SUMMARY_HEDGE_DELAY; local computation is the last resort. LLM results are cached
+    by exact prompt hash, so re-uploads of the same contract skip the agent
+    entirely.
     """
-    prompt = _build_summary_prompt(contract_type, clause_results, contract_text_preview)
-
-    # ── Attempt 1: Dedalus agent with native tools + Exa MCP (60s) ──
-    # The agent can:
-    #   - Call compute_risk_breakdown() to calculate precise category scores
-    #   - Call find_key_dates() to extract dates from the contract text
-    #   - Use Exa MCP (via DAuth) to research legal standards and precedents
-    #   - Synthesize all tool outputs into the final summary
-    try:
-        runner = DedalusRunner(client)
-        response = await asyncio.wait_for(
-            runner.run(
-                model="anthropic/claude-sonnet-4-5",
-                input=prompt,
-                instructions=AGENT_SYSTEM_PROMPT,
-                tools=[compute_risk_breakdown, find_key_dates],
-                mcp_servers=["exa-labs/exa-mcp-server"],
-                max_steps=5,
-                stream=False,
-            ),
-            timeout=60.0,
-        )
-        output = getattr(response, "final_output", "") or ""
-        result = _parse_llm_json(output)
-        print("  Summary via Dedalus OK (multi-tool agent)")
+    # ── Short-circuit: tiny contracts with nothing high-risk ──
+    # The agent can't add anything the local summary doesn't already say.
+    if len(clause_results) <= SUMMARY_LOCAL_MAX_CLAUSES and not any(
+        c.get("riskLevel") == "high" for c in clause_results
+    ):
+        result = _local_fallback_summary(contract_type, clause_results)
+        result["keyDates"] = key_dates
+        result["summaryPath"] = "local"
+        logger.info(f"  Summary computed locally ({len(clause_results)} clauses, none high-risk)")
         return result
-    except asyncio.TimeoutError:
-        print("  Dedalus timed out (60s), falling back to K2")
-    except Exception as e:
-        print(f"  Dedalus summary failed: {e}, falling back to K2")
 
-    # ── Attempt 2: K2 Think via Vultr (direct LLM, no tools) ────────
+    prompt = _build_summary_prompt(contract_type, clause_results, key_dates)
+
+    # ── Cache lookup: exact prompt (clauses, dates and all) ─────────
+    cache_key = f"{SUMMARY_CACHE_VERSION}:{hashlib.sha256(prompt.encode()).hexdigest()}"
     try:
-        from k2_client import k2
-
-        response = await k2.chat.completions.create(
-            model="kimi-k2-instruct",
-            messages=[
-                {"role": "system", "content": "You are ContractPilot. Respond ONLY with valid JSON."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=1024,
-        )
-        output = response.choices[0].message.content or "{}"
-        result = _parse_llm_json(output)
-        print("  Summary via K2 fallback OK")
-        return result
+        cached = await asyncio.to_thread(_summary_cache.get_exact, cache_key)
+        if cached is not None:
+            logger.info("  Summary cache hit (exact)")
+            return {**orjson.loads(cached), "summaryPath": "cache"}
     except Exception as e:
-        print(f"  K2 summary also failed: {e}, using local fallback")
+        logger.warning(f"  Summary cache lookup failed: {e}")
+
+    def _remember(result: dict) -> None:
+        try:
+            _summary_cache.put(cache_key, contract_type, None, orjson.dumps(result).decode())
+        except Exception as e:
+            logger.warning(f"  Summary cache write failed: {e}")
+
+    # ── Attempts 1+2: Dedalus agent, hedged with K2 ─────────────────
+    # Dedalus gets a SUMMARY_HEDGE_DELAY head start. If it is still running
+    # (or already failed) by then, K2 is launched alongside it and whichever
+    # returns valid JSON first wins; the other is cancelled.
+    tasks = {asyncio.create_task(_dedalus_summary(prompt)): "dedalus"}
+    pending = set(tasks)
+    try:
+        done, pending = await asyncio.wait(pending, timeout=SUMMARY_HEDGE_DELAY)
+        while True:
+            for task in done:
+                try:
+                    result = task.result()
+                except asyncio.TimeoutError:
+                    logger.warning(f"  {tasks[task].capitalize()} summary timed out")
+                    continue
+                except Exception as e:
+                    logger.warning(f"  {tasks[task].capitalize()} summary failed: {e}")
+                    continue
+                logger.info(f"  Summary via {tasks[task].capitalize()} OK")
+                await asyncio.to_thread(_remember, result)
+                return {**result, "summaryPath": tasks[task]}
+            if "k2" not in tasks.values():
+                if pending:
+                    logger.info(f"  Dedalus still running after {SUMMARY_HEDGE_DELAY:.0f}s, hedging with K2")
+                k2_task = asyncio.create_task(_k2_summary(prompt))
+                tasks[k2_task] = "k2"
+                pending.add(k2_task)
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    logger.warning("  Dedalus and K2 summaries both failed, using local fallback")
 
     # ── Attempt 3: Local computation (instant, no LLM) ──────────────
-    return _local_fallback_summary(contract_type, clause_results)
+    return {**_local_fallback_summary(contract_type, clause_results), "summaryPath": "local"}
+
+
+def _document_hash(pdf_bytes: bytes, pdf_text: str, ocr_used: bool) -> str:
+    """Content hash identifying a document + extraction mode for Phase 1 caching."""
+    digest = xxhash.xxh3_128_hexdigest(pdf_bytes or pdf_text.encode())
+    return f"{digest}:{'ocr' if ocr_used else 'text'}"
+
+
+async def _start_summary_early(
+    review_id: str,
+    clause_tasks: list[asyncio.Task],
+    contract_type: str,
+    key_dates: list[dict],
+) -> tuple[asyncio.Task, list[int]]:
+    """Start the Phase 3 summary once most clauses have been analyzed.
+
+    Waits until SUMMARY_START_FRACTION of the clause tasks are done, then gives
+    the stragglers up to SUMMARY_TAIL_WAIT seconds before firing the summary
+    with whatever has finished. Clauses still running at that point are left
+    out of the summary input; the caller folds them back in with
+    _reconcile_summary once they finish.
+
+    Returns:
+        The running summary task and the indices of the clauses it left out.
+    """
+    pending = set(clause_tasks)
+    needed = math.ceil(len(clause_tasks) * SUMMARY_START_FRACTION)
+    while pending and len(clause_tasks) - len(pending) < needed:
+        _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    if pending:
+        _, pending = await asyncio.wait(pending, timeout=SUMMARY_TAIL_WAIT)
+
+    finished = [t.result() for t in clause_tasks if t.done()]
+    if pending:
+        logger.info(
+            f"[{review_id}] Phase 3: starting summary with {len(finished)}/"
+            f"{len(clause_tasks)} clauses ({len(pending)} still running)"
+        )
+    else:
+        logger.info(f"[{review_id}] Phase 3: Dedalus agent summary (Exa MCP)")
+
+    late = [i for i, t in enumerate(clause_tasks) if not t.done()]
+    task = asyncio.create_task(_generate_summary(contract_type, finished, key_dates))
+    return task, late
 
 
 async def run_contract_analysis(
@@ -301,32 +917,40 @@ async def run_contract_analysis(
     """Run the hybrid contract analysis pipeline.
 
     Phase 1: Classification + K2-powered clause extraction (direct Python)
-    Phase 2: Concurrent clause analysis via K2+RAG (6 parallel, direct Python)
-    Phase 3: Dedalus agent summary with native tools + Exa MCP (multi-step)
+    Phase 2: Concurrent clause analysis via K2+RAG (separately throttled, direct Python)
+    Phase 3: Dedalus agent summary with precomputed scores/dates + Exa MCP,
+             started while the last clauses of Phase 2 are still running
 
     Clause-level analysis uses direct K2+RAG for speed (parallelism can't go
     through an agent loop). Dedalus owns the intelligence layer — dynamically
     choosing between compute_risk_breakdown, find_key_dates, and Exa research
     to generate the final summary.
     """
-    t_start = time.time()
+    t_start = time.perf_counter_ns()
 
     # Update status to processing
     try:
-        convex.mutation("reviews:updateStatus", {"id": review_id, "status": "processing"})
+        await _amutation("reviews:updateStatus", {"id": review_id, "status": "processing"})
     except Exception:
         pass
 
     try:
         # ── Phase 1: Classification + K2-powered extraction ─────────
-        print(f"[{review_id}] Phase 1: classify + extract (K2)")
-        contract_type = classify_contract(pdf_text[:5000])
-        all_clauses = await extract_clauses_k2(pdf_text)
-        print(f"  Type: {contract_type}, Clauses found: {len(all_clauses)}")
+        doc_hash = _document_hash(pdf_bytes, pdf_text, ocr_used)
+        cached_phase1 = _phase1_cache.get(doc_hash)
+        if cached_phase1 is not None:
+            _phase1_cache.move_to_end(doc_hash)
+            contract_type, all_clauses, clause_positions = cached_phase1
+            logger.info(f"[{review_id}] Phase 1: cache hit")
+        else:
+            logger.info(f"[{review_id}] Phase 1: classify + extract (K2)")
+            contract_type = classify_contract(pdf_text[:5000])
+            all_clauses = await extract_clauses_k2(pdf_text)
+        logger.info(f"  Type: {contract_type}, Clauses found: {len(all_clauses)}")
 
         # Report total clause count to frontend
         try:
-            convex.mutation("reviews:updateProgress", {
+            await _amutation("reviews:updateProgress", {
                 "id": review_id,
                 "totalClauses": len(all_clauses),
                 "completedClauses": 0,
@@ -335,53 +959,90 @@ async def run_contract_analysis(
             pass
 
         # Extract clause positions from PDF
-        clause_positions = []
-        if pdf_bytes:
-            try:
-                if ocr_used and ocr_words:
-                    clause_positions = match_clauses_to_ocr_boxes(all_clauses, ocr_words, pdf_bytes)
-                    print(f"  Matched OCR positions for {len(clause_positions)} clauses")
-                else:
-                    clause_positions = extract_clause_positions(pdf_bytes, all_clauses)
-                    print(f"  Extracted positions for {len(clause_positions)} clauses")
-            except Exception as e:
-                print(f"  Position extraction failed: {e}")
+        if cached_phase1 is None:
+            clause_positions = []
+            positions_ok = True
+            if pdf_bytes:
+                try:
+                    if ocr_used and ocr_words:
+                        clause_positions = match_clauses_to_ocr_boxes(all_clauses, ocr_words, pdf_bytes)
+                        logger.info(f"  Matched OCR positions for {len(clause_positions)} clauses")
+                    else:
+                        clause_positions = extract_clause_positions(pdf_bytes, all_clauses)
+                        logger.info(f"  Extracted positions for {len(clause_positions)} clauses")
+                except Exception as e:
+                    positions_ok = False
+                    logger.warning(f"  Position extraction failed: {e}")
+            if positions_ok:
+                _phase1_cache[doc_hash] = (contract_type, all_clauses, clause_positions)
+                if len(_phase1_cache) > PHASE1_CACHE_SIZE:
+                    _phase1_cache.popitem(last=False)
 
         # ── Phase 2: Analyze ALL clauses (semaphore-throttled) ──────
-        # Direct K2+RAG for speed — 6-concurrent parallelism requires
+        # Direct K2+RAG for speed — concurrent parallelism requires
         # direct execution, not an agent loop.
-        print(f"[{review_id}] Phase 2: analyzing {len(all_clauses)} clauses (max {CLAUSE_CONCURRENCY} concurrent)")
-        t_phase2 = time.time()
+        logger.info(
+            f"[{review_id}] Phase 2: analyzing {len(all_clauses)} clauses "
+            f"(max {k2_admission.max_concurrent} K2 / "
+            f"{rag_admission.max_concurrent} RAG concurrent)"
+        )
+        t_phase2 = time.perf_counter_ns()
 
-        sem = asyncio.Semaphore(CLAUSE_CONCURRENCY)
         counter = {"completed": 0}
 
-        clause_results = list(await asyncio.gather(
-            *[
-                _analyze_one_clause_throttled(
-                    sem, clause, contract_type, i,
-                    clause_positions[i] if i < len(clause_positions) else None,
-                    review_id, counter, len(all_clauses),
-                )
-                for i, clause in enumerate(all_clauses)
-            ]
-        ))
-
-        print(f"  Phase 2 done in {time.time() - t_phase2:.1f}s")
-
-        # ── Phase 3: Dedalus agent summary (multi-tool orchestration) ─
-        # Dedalus agent with native tools + Exa MCP. The agent decides
-        # which tools to call: risk computation, date extraction, and/or
-        # web research via Exa (DAuth-secured). This is genuine non-linear
-        # multi-step reasoning — the core Dedalus showcase.
-        print(f"[{review_id}] Phase 3: Dedalus agent summary (tools + Exa MCP)")
-        t_phase3 = time.time()
-
-        summary_data = await _generate_summary(
-            contract_type, clause_results, pdf_text,
+        # Key dates are deterministic — extract them now so Phase 3 gets
+        # structured data instead of holding on to the contract text.
+        key_dates = orjson.loads(find_key_dates(pdf_text))
+
+        batcher = ConvexBatcher(review_id)
+        batcher.start()
+        shared_analyses: dict[str, asyncio.Task] = {}
+        clause_tasks = [
+            asyncio.create_task(_analyze_one_clause_throttled(
+                clause, contract_type, i,
+                clause_positions[i] if i < len(clause_positions) else None,
+                batcher, counter, len(all_clauses),
+                shared_analyses,
+            ))
+            for i, clause in enumerate(all_clauses)
+        ]
+        summary_task = None
+        try:
+            # ── Phase 3: Dedalus agent summary (multi-tool orchestration) ─
+            # Risk breakdown and key dates are precomputed into the prompt;
+            # the agent decides whether to do web research via Exa
+            # (DAuth-secured) before synthesizing the summary.
+            # The summary only needs clause-level results, so it starts once
+            # most clauses are done and overlaps the tail of Phase 2.
+            summary_task, late_clauses = await _start_summary_early(
+                review_id, clause_tasks, contract_type, key_dates,
+            )
+            t_phase3 = time.perf_counter_ns()
+            clause_results = list(await asyncio.gather(*clause_tasks))
+        except BaseException:
+            if summary_task is not None:
+                summary_task.cancel()
+            # Stop every in-flight clause (and the shared analyses they wait
+            # on) so nothing keeps spending K2/RAG quota or queues results
+            # after the batcher has drained.
+            pending = [*clause_tasks, *shared_analyses.values()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        finally:
+            await batcher.drain()
+
+        rag_total = sum(c["timings"]["rag_ms"] for c in clause_results)
+        k2_total = sum(c["timings"]["k2_ms"] for c in clause_results)
+        logger.info(
+            f"  Phase 2 done in {_elapsed_ms(t_phase2)}ms "
+            f"(RAG {rag_total}ms, K2 {k2_total}ms summed across clauses)"
         )
 
-        print(f"  Phase 3 done in {time.time() - t_phase3:.1f}s")
+        summary_data = _reconcile_summary(await summary_task, clause_results, late_clauses)
+
+        logger.info(f"  Phase 3 done in {_elapsed_ms(t_phase3)}ms")
 
         # ── Phase 4: Assemble + save ─────────────────────────────────
         result = {
@@ -395,38 +1056,37 @@ async def run_contract_analysis(
             "clauses": clause_results,
             "actionItems": summary_data.get("actionItems", []),
             "keyDates": summary_data.get("keyDates", []),
+            "summaryPath": summary_data.get("summaryPath", "local"),
         }
 
-        _save_results(review_id, result, ocr_used)
+        await _save_results(review_id, result, ocr_used)
 
-        elapsed = time.time() - t_start
-        print(f"[{review_id}] DONE in {elapsed:.1f}s — {contract_type}, score {result['riskScore']}, {len(clause_results)} clauses")
+        elapsed = _elapsed_ms(t_start) / 1000
+        logger.info(f"[{review_id}] DONE in {elapsed:.1f}s — {contract_type}, score {result['riskScore']}, {len(clause_results)} clauses, summary via {result['summaryPath']}")
 
         return result
 
+    except asyncio.CancelledError:
+        # Server shutdown or a cancelled review: don't leave it "processing"
+        await _mark_failed(review_id)
+        raise
     except Exception as e:
-        try:
-            convex.mutation(
-                "reviews:updateStatus", {"id": review_id, "status": "failed"}
-            )
-        except Exception:
-            pass
+        await _mark_failed(review_id)
         raise RuntimeError(f"Agent analysis failed: {e}") from e
 
 
-def _save_one_clause(review_id: str, clause: dict) -> None:
-    """Save a single analyzed clause to Convex."""
+def _clause_payload(clause: dict) -> dict:
+    """Build the Convex clause document for an analyzed clause (sans reviewId)."""
     clause_data = {
-        "reviewId": review_id,
         "clauseText": clause.get("clauseText", ""),
         "clauseType": clause.get("clauseType", "Unknown"),
         "riskLevel": clause.get("riskLevel", "medium"),
         "riskCategory": clause.get("riskCategory", "operational"),
         "explanation": clause.get("explanation", ""),
-        "concern": clause.get("concern"),
-        "suggestion": clause.get("suggestion"),
-        "k2Reasoning": clause.get("k2Reasoning"),
     }
+    for key in ("concern", "suggestion", "k2Reasoning"):
+        if clause.get(key) is not None:
+            clause_data[key] = clause[key]
     if "pageNumber" in clause:
         clause_data["pageNumber"] = clause["pageNumber"]
         clause_data["rects"] = clause.get("rects", "[]")
@@ -436,13 +1096,18 @@ def _save_one_clause(review_id: str, clause: dict) -> None:
         clause_data["parentHeading"] = clause["parentHeading"]
     if clause.get("subClauseIndex") is not None:
         clause_data["subClauseIndex"] = clause["subClauseIndex"]
-    convex.mutation("clauses:addClause", clause_data)
+    return clause_data
+
+
+async def _save_one_clause(review_id: str, clause: dict) -> None:
+    """Save a single analyzed clause to Convex."""
+    await _amutation("clauses:addClause", {"reviewId": review_id, **_clause_payload(clause)})
 
 
-def _save_results(review_id: str, result: dict, ocr_used: bool) -> None:
+async def _save_results(review_id: str, result: dict, ocr_used: bool) -> None:
     """Save summary results to Convex. Clauses are already saved incrementally."""
     try:
-        convex.mutation(
+        await _amutation(
             "reviews:setResults",
             {
                 "id": review_id,
@@ -461,4 +1126,4 @@ def _save_results(review_id: str, result: dict, ocr_used: bool) -> None:
             },
         )
     except Exception as e:
-        print(f"Warning: Failed to save results to Convex: {e}")
+        logger.warning(f"Failed to save results to Convex: {e}")
@@ -15,33 +15,152 @@ Fallback: Direct K2 Think + RAG (always works, no Dedalus required).
 """
 
 import asyncio
+import hashlib
 import os
 import re
+import time
+from collections import OrderedDict, deque
 from pathlib import Path
 
-from dedalus_labs import AsyncDedalus, DedalusRunner
+from dedalus_labs import DedalusRunner
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 
-from vultr_rag import query_legal_knowledge
+from http_clients import dedalus, k2
+from rag_cache import cached_query
+from vultr_rag import COLLECTION_ID, VULTR_API_KEY
 
 load_dotenv(Path(__file__).parent / ".env")
 
-# Dedalus client — primary chat agent orchestrator.
-# MCP servers (Brave, Exa) use Dedalus Auth (DAuth) — OAuth 2.1 credentials
-# are managed securely by the Dedalus platform. No third-party API keys needed.
-_chat_client = AsyncDedalus(
-    api_key=os.environ.get("DEDALUS_API_KEY", ""),
-    timeout=60.0,
-)
+# Dedalus is the primary chat agent orchestrator. The runner is built once
+# and shared by every chat request (runs are independent).
+_runner = DedalusRunner(dedalus)
+
+# The key can't change while the process runs, so check it once
+_HAS_DEDALUS = bool(os.environ.get("DEDALUS_API_KEY"))
+
+AGENT_TIMEOUT = 25.0
+# After DEDALUS_FAILURE_LIMIT agent failures within DEDALUS_FAILURE_WINDOW
+# seconds, requests skip straight to the fallback until the oldest one ages out
+DEDALUS_FAILURE_LIMIT = 3
+DEDALUS_FAILURE_WINDOW = 60.0  # seconds
+_dedalus_failures: deque[float] = deque(maxlen=5)
+# Optional knowledge base lookup + one web search + the answer
+AGENT_MAX_STEPS = 3
+# Inputs are capped once on entry so no prompt below can balloon
+CHAT_CLAUSE_CHARS = 1500
+CHAT_QUESTION_CHARS = 500
+RAG_PREFETCH_TIMEOUT = 5.0  # Knowledge base lookup budget before the agent starts
+# Messages the knowledge base lookup returns instead of results
+_KB_SENTINELS = ("RAG query failed", "Legal knowledge base not configured")
+
+# Matches URLs in MCP tool output. A single character class with one
+# quantifier, so matching is linear even on adversarial input.
+_URL_RE = re.compile(r'https?://[^\s"\'<>]+')
+MAX_SOURCES = 5  # URLs returned with each answer
+
 
-_k2 = AsyncOpenAI(
-    api_key=os.environ.get("VULTR_INFERENCE_API_KEY", ""),
-    base_url="https://api.vultrinference.com/v1",
-    timeout=60.0,
+def _circuit_open() -> bool:
+    """Whether Dedalus failed often enough recently to skip it for now."""
+    cutoff = time.monotonic() - DEDALUS_FAILURE_WINDOW
+    while _dedalus_failures and _dedalus_failures[0] < cutoff:
+        _dedalus_failures.popleft()
+    return len(_dedalus_failures) >= DEDALUS_FAILURE_LIMIT
+
+
+# Short definitional questions ("what does this mean?") are answered by one
+# K2 call; the Dedalus agent's tool loop adds nothing for them.
+SIMPLE_QUESTION_CHARS = 80
+_SIMPLE_QUESTION_RE = re.compile(
+    r"^\s*(what|explain|summari[sz]e|tl;?dr|define|mean|eli5|in plain english)\b",
+    re.IGNORECASE,
 )
+_RESEARCH_QUESTION_RE = re.compile(
+    r"\b(compare|case law|precedents?|recent|news|court|ruling|statute|jurisdiction)\b",
+    re.IGNORECASE,
+)
+
+
+def _is_simple_question(question: str) -> bool:
+    """Whether a question can skip web research and go straight to K2."""
+    return (
+        len(question) < SIMPLE_QUESTION_CHARS
+        and _SIMPLE_QUESTION_RE.match(question) is not None
+        and _URL_RE.search(question) is None
+        and _RESEARCH_QUESTION_RE.search(question) is None
+    )
+
+
+# Chat history included in prompts: newest messages first, until the budget
+HISTORY_MAX_MESSAGES = 6
+HISTORY_MESSAGE_CHARS = 512
+HISTORY_BUDGET_CHARS = 2048
+
+
+def _format_history(history: list[dict]) -> str:
+    """Render recent chat turns for the prompt within a fixed size budget.
+
+    Walks back from the newest message, truncating each to
+    HISTORY_MESSAGE_CHARS, and stops once HISTORY_BUDGET_CHARS is reached so
+    one long earlier answer can't balloon the prompt.
+    """
+    parts: list[str] = []
+    used = 0
+    for m in reversed(history[-HISTORY_MAX_MESSAGES:]):
+        speaker = "User" if m.get("role") == "user" else "Assistant"
+        line = f"{speaker}: {m.get('content', '')[:HISTORY_MESSAGE_CHARS]}"
+        if used + len(line) > HISTORY_BUDGET_CHARS:
+            break
+        parts.append(line)
+        used += len(line)
+    if not parts:
+        return ""
+    return "\n\nRecent conversation:\n" + "\n".join(reversed(parts))
 
-AGENT_TIMEOUT = 50.0
+
+# Answers to opening questions are reused for exact repeats (after
+# normalizing case, whitespace and trailing punctuation) about the same
+# clause. Near-duplicates are not: "can they terminate" and "can I terminate"
+# need different answers. Follow-ups are never served from here since their
+# answer depends on the conversation so far.
+QUESTION_CACHE_PER_CLAUSE = 64
+QUESTION_CACHE_CLAUSES = 512
+# clause key -> {normalized question: answer}, oldest first at both levels
+_question_cache: OrderedDict[str, OrderedDict[str, dict]] = OrderedDict()
+_QUESTION_WS_RE = re.compile(r"\s+")
+
+
+def _clause_key(clause_text: str, clause_type: str, contract_type: str) -> str:
+    return hashlib.sha1(f"{contract_type}\0{clause_type}\0{clause_text}".encode()).hexdigest()
+
+
+def _normalize_question(question: str) -> str:
+    return _QUESTION_WS_RE.sub(" ", question.lower()).strip().rstrip("?!. ")
+
+
+def _cached_answer(clause_key: str, question_key: str) -> dict | None:
+    entries = _question_cache.get(clause_key)
+    if not entries or not question_key:
+        return None
+    cached = entries.get(question_key)
+    if cached is None:
+        return None
+    _question_cache.move_to_end(clause_key)
+    return {"answer": cached["answer"], "sources": list(cached["sources"])}
+
+
+def _remember_answer(clause_key: str, question_key: str, result: dict) -> None:
+    if not question_key:
+        return
+    entries = _question_cache.get(clause_key)
+    if entries is None:
+        entries = _question_cache[clause_key] = OrderedDict()
+    _question_cache.move_to_end(clause_key)
+    entries[question_key] = result
+    entries.move_to_end(question_key)
+    while len(entries) > QUESTION_CACHE_PER_CLAUSE:
+        entries.popitem(last=False)
+    while len(_question_cache) > QUESTION_CACHE_CLAUSES:
+        _question_cache.popitem(last=False)
 
 
 # ── Native tool for Dedalus agent ──────────────────────────────────────
@@ -58,7 +177,7 @@ async def search_legal_knowledge_base(clause_text: str, clause_type: str) -> str
     Returns:
         Relevant legal standards, common practices, and risk factors.
     """
-    return await query_legal_knowledge(clause_text[:1000], clause_type)
+    return await cached_query(clause_text[:1000], clause_type)
 
 
 async def chat_about_clause(
@@ -71,20 +190,30 @@ async def chat_about_clause(
     """Answer a user question about a contract clause.
 
     Primary: Dedalus agent with native RAG tool + dual MCP (Brave + Exa).
-    Fallback: Direct K2 Think + RAG (no Dedalus required).
+    Fallback: Direct K2 Think + RAG (no Dedalus required). Simple
+    definitional questions go straight to this path.
     Returns: {"answer": str, "sources": list[str]}
     """
-    history = chat_history or []
-    recent = history[-4:] if len(history) > 4 else history
-    history_text = ""
-    if recent:
-        history_text = "\n\nRecent conversation:\n" + "\n".join(
-            f"{'User' if m.get('role') == 'user' else 'Assistant'}: {m.get('content', '')}"
-            for m in recent
-        )
+    question = question[:CHAT_QUESTION_CHARS].strip()
+    clause_text = clause_text[:CHAT_CLAUSE_CHARS].strip()
+    history_text = _format_history(chat_history or [])
+
+    # --- Answer cache (opening questions only) ---
+    clause_key = question_key = None
+    if not chat_history:
+        clause_key = _clause_key(clause_text, clause_type, contract_type)
+        question_key = _normalize_question(question)
+        cached = _cached_answer(clause_key, question_key)
+        if cached is not None:
+            print("  Chat: answered from question cache")
+            return cached
 
     # --- Primary: Dedalus agent with native + MCP tools ---
-    if os.environ.get("DEDALUS_API_KEY"):
+    if _is_simple_question(question):
+        print("  Chat: simple question, skipping the Dedalus agent")
+    elif _HAS_DEDALUS and _circuit_open():
+        print("  Chat: Dedalus failing repeatedly, skipping the agent for now")
+    elif _HAS_DEDALUS:
         try:
             result = await _dedalus_multi_tool_chat(
                 question, clause_text, clause_type, contract_type, history_text
@@ -92,16 +221,69 @@ async def chat_about_clause(
             answer = result.get("answer", "")
             if answer:
                 print(f"  Chat: Dedalus multi-tool agent OK ({len(answer)} chars)")
+                if clause_key:
+                    _remember_answer(clause_key, question_key, result)
                 return result
             print("  Chat: Dedalus returned empty response, falling back")
         except Exception as e:
+            _dedalus_failures.append(time.monotonic())
             print(f"  Chat: Dedalus agent failed ({e}), falling back")
 
     # --- Fallback: Direct RAG + K2 ---
     print("  Chat: Using direct RAG + K2 fallback")
-    return await _rag_k2_chat(
+    result = await _rag_k2_chat(
         question, clause_text, clause_type, contract_type, history_text
     )
+    if result is None:
+        return {
+            "answer": (
+                "I can provide some guidance based on the clause analysis. "
+                f"This {clause_type} clause in your {contract_type} contract "
+                "should be reviewed carefully with a legal professional for "
+                "specific advice about your situation."
+            ),
+            "sources": [],
+        }
+    if clause_key and result["answer"]:
+        _remember_answer(clause_key, question_key, result)
+    return result
+
+
+# ── Agent prompt fragments (built once) ────────────────────────────────
+_KB_RESULTS_HEAD = "Legal knowledge base results (pre-fetched):\n"
+_KB_RESULTS_TAIL = (
+    "\n\nUse web search tools if you need recent legal information or examples, "
+    "then synthesize everything into a clear, well-sourced answer."
+)
+_RESEARCH_WITH_TOOLS = (
+    "Use your available tools to research this question:\n"
+    "- search_legal_knowledge_base: query the legal knowledge base for standards and precedents\n"
+    "- Web search tools: find recent legal information and examples\n"
+    "Then synthesize your findings into a clear, well-sourced answer."
+)
+
+
+def _agent_instructions(kb_instructions: str) -> str:
+    return (
+        "You are a legal research assistant helping a user understand "
+        "a contract clause. You have access to:\n"
+        f"{kb_instructions}"
+        "2. Web search tools (Brave, Exa) — use these for recent legal "
+        "developments, case examples, and best practices.\n\n"
+        "Use at most one web search tool call, then answer.\n"
+        "Answer in plain English, 2-4 paragraphs. "
+        "Cite sources where possible with URLs."
+    )
+
+
+_AGENT_INSTRUCTIONS_PREFETCHED = _agent_instructions(
+    "1. Pre-fetched legal knowledge base results (legal standards, CUAD "
+    "dataset context, clause benchmarks) are included in the prompt.\n"
+)
+_AGENT_INSTRUCTIONS_KB_TOOL = _agent_instructions(
+    "1. A legal knowledge base tool (search_legal_knowledge_base) — use this "
+    "to find legal standards, CUAD dataset context, and clause benchmarks.\n"
+)
 
 
 async def _dedalus_multi_tool_chat(
@@ -111,46 +293,56 @@ async def _dedalus_multi_tool_chat(
     contract_type: str,
     history_text: str,
 ) -> dict:
-    """Primary path: Dedalus agent with native RAG tool + Brave + Exa MCP.
+    """Primary path: Dedalus agent with legal knowledge base + Brave + Exa MCP.
 
-    The agent dynamically decides which tools to call:
-    - search_legal_knowledge_base (native): query CUAD/legal clause standards
+    The knowledge base lookup is almost always useful, so it is pre-fetched
+    and put straight into the prompt — saving the agent a round trip to
+    decide to call it. Only if the pre-fetch fails or is slow does the agent
+    get search_legal_knowledge_base as a native tool instead. The agent
+    then decides which web tools to call:
     - brave_web_search (Brave MCP): search the web for recent legal info
     - exa search (Exa MCP): search academic/legal sources for deeper research
     """
-    prompt = (
+    kb_context = None
+    # Without a configured knowledge base the lookup only returns a sentinel
+    # string, which must not be passed off as results
+    if VULTR_API_KEY and COLLECTION_ID:
+        try:
+            kb_context = await asyncio.wait_for(
+                cached_query(clause_text[:1000], clause_type), timeout=RAG_PREFETCH_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            print(f"  Chat: knowledge base pre-fetch exceeded {RAG_PREFETCH_TIMEOUT:.0f}s")
+    if kb_context and kb_context.startswith(_KB_SENTINELS):
+        kb_context = None
+
+    if kb_context:
+        research = (_KB_RESULTS_HEAD, kb_context, _KB_RESULTS_TAIL)
+        tools = []
+        instructions = _AGENT_INSTRUCTIONS_PREFETCHED
+    else:
+        research = (_RESEARCH_WITH_TOOLS,)
+        tools = [search_legal_knowledge_base]
+        instructions = _AGENT_INSTRUCTIONS_KB_TOOL
+
+    prompt = "".join((
         f"The user is reviewing a {contract_type} contract and has a question about "
         f"a specific clause.\n\n"
         f"Clause type: {clause_type}\n"
-        f"Clause text: {clause_text[:1500]}\n"
+        f"Clause text: {clause_text}\n"
         f"{history_text}\n\n"
-        f"User question: {question}\n\n"
-        f"Use your available tools to research this question:\n"
-        f"- search_legal_knowledge_base: query the legal knowledge base for standards and precedents\n"
-        f"- Web search tools: find recent legal information and examples\n"
-        f"Then synthesize your findings into a clear, well-sourced answer."
-    )
+        f"User question: {question}\n\n",
+        *research,
+    ))
 
-    runner = DedalusRunner(_chat_client)
     response = await asyncio.wait_for(
-        runner.run(
+        _runner.run(
             model="anthropic/claude-sonnet-4-5",
             input=prompt,
-            instructions=(
-                "You are a legal research assistant helping a user understand "
-                "a contract clause. You have access to:\n"
-                "1. A legal knowledge base tool (search_legal_knowledge_base) — use this "
-                "to find legal standards, CUAD dataset context, and clause benchmarks.\n"
-                "2. Web search tools (Brave, Exa) — use these for recent legal "
-                "developments, case examples, and best practices.\n\n"
-                "Use at least one tool before answering. Combine multiple sources "
-                "when possible for a comprehensive answer.\n"
-                "Answer in plain English, 2-4 paragraphs. "
-                "Cite sources where possible with URLs."
-            ),
-            tools=[search_legal_knowledge_base],
+            instructions=instructions,
+            tools=tools,
             mcp_servers=["brave-search/brave-search", "exa-labs/exa-mcp-server"],
-            max_steps=5,
+            max_steps=AGENT_MAX_STEPS,
             stream=False,
         ),
         timeout=AGENT_TIMEOUT,
@@ -167,16 +359,16 @@ async def _rag_k2_chat(
     clause_type: str,
     contract_type: str,
     history_text: str,
-) -> dict:
-    """Fallback path: Vultr RAG for context + K2 for reasoning."""
-    # Get RAG context (always works, returns error string on failure)
-    rag_context = await query_legal_knowledge(clause_text[:1000], clause_type)
+) -> dict | None:
+    """Fallback path: Vultr RAG for context + K2 for reasoning (None if K2 fails)."""
+    # Get RAG context (cached; always works, returns error string on failure)
+    rag_context = await cached_query(clause_text[:1000], clause_type)
 
     user_prompt = (
         f"You are a legal research assistant. A user is reviewing a {contract_type} "
         f"contract and has a question about a clause.\n\n"
         f"Clause type: {clause_type}\n"
-        f"Clause text:\n{clause_text[:1500]}\n\n"
+        f"Clause text:\n{clause_text}\n\n"
         f"Legal research context:\n{rag_context}\n"
         f"{history_text}\n\n"
         f"User question: {question}\n\n"
@@ -185,7 +377,7 @@ async def _rag_k2_chat(
     )
 
     try:
-        response = await _k2.chat.completions.create(
+        response = await k2.chat.completions.create(
             model="kimi-k2-instruct",
             messages=[
                 {
@@ -205,23 +397,17 @@ async def _rag_k2_chat(
         return {"answer": answer, "sources": []}
     except Exception as e:
         print(f"  Chat: K2 fallback also failed: {e}")
-        return {
-            "answer": (
-                "I can provide some guidance based on the clause analysis. "
-                f"This {clause_type} clause in your {contract_type} contract "
-                "should be reviewed carefully with a legal professional for "
-                "specific advice about your situation."
-            ),
-            "sources": [],
-        }
+        return None
 
 
 def _extract_sources(response) -> list[str]:
     """Pull URLs from MCP tool results if available."""
-    sources = []
     tool_results = getattr(response, "tool_results", []) or []
+    seen: dict[str, None] = {}  # Ordered set: dedupe, keep first-seen order
     for tr in tool_results:
-        result_text = tr.get("result", "") if isinstance(tr, dict) else str(tr)
-        urls = re.findall(r'https?://[^\s"\'<>]+', result_text)
-        sources.extend(urls)
-    return list(dict.fromkeys(sources))[:5]  # dedupe, max 5
+        text = tr.get("result", "") if isinstance(tr, dict) else str(tr)
+        for match in _URL_RE.finditer(text):
+            seen.setdefault(match.group(), None)
+            if len(seen) >= MAX_SOURCES:
+                return list(seen)
+    return list(seen)
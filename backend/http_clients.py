@@ -0,0 +1,46 @@
+"""Shared API clients for K2 (Vultr Inference) and Dedalus.
+
+Every module talks to K2 and Dedalus through these two instances, so the
+clause fan-out, the summary agent and chat all draw from the same warm
+HTTP/2 connection pools. Each new client would otherwise pay its own TCP+TLS
+handshake on its first call.
+"""
+
+import os
+from pathlib import Path
+
+import httpx
+from dedalus_labs import AsyncDedalus
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+load_dotenv(Path(__file__).parent / ".env")
+
+# Every clause hits K2 — keep enough warm connections for full concurrency.
+# HTTP/2 multiplexes concurrent requests over those connections.
+POOL_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=32,
+    keepalive_expiry=60,
+)
+
+k2 = AsyncOpenAI(
+    api_key=os.environ.get("VULTR_INFERENCE_API_KEY", ""),
+    base_url="https://api.vultrinference.com/v1",
+    timeout=60.0,
+    http_client=DefaultAsyncHttpxClient(http2=True, limits=POOL_LIMITS),
+)
+
+# MCP servers (Brave, Exa) use Dedalus Auth (DAuth) — OAuth 2.1 credentials
+# are managed securely by the Dedalus platform. No third-party API keys needed.
+dedalus = AsyncDedalus(
+    api_key=os.environ.get("DEDALUS_API_KEY", ""),
+    timeout=120.0,
+    http_client=httpx.AsyncClient(http2=True, limits=POOL_LIMITS),
+)
+
+
+async def aclose() -> None:
+    """Close both shared clients (call on shutdown)."""
+    await k2.close()
+    await dedalus.close()
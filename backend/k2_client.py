@@ -6,19 +6,46 @@ Called TWICE in the pipeline:
   - Step 9: Enrichment with all gathered context (Brave, Exa, context7, RAG)
 """
 
-import os
+import asyncio
+import hashlib
 import json
-from pathlib import Path
 
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+import orjson
 
-load_dotenv(Path(__file__).parent / ".env")
+from http_clients import k2
+from llm_json import parse_llm_json
+from semantic_cache import SemanticCache
 
-k2 = AsyncOpenAI(
-    api_key=os.environ.get("VULTR_INFERENCE_API_KEY", ""),
-    base_url="https://api.vultrinference.com/v1",
-    timeout=60.0,
+# Clause analyses persist across runs: re-uploads and template contracts send
+# the same boilerplate through K2 again and again.
+ANALYSIS_CACHE_TTL = 30 * 24 * 3600  # seconds
+_analysis_cache = SemanticCache("k2_analysis", ttl=ANALYSIS_CACHE_TTL)
+
+
+def prune_cache() -> int:
+    """Delete expired clause analyses; returns how many were removed."""
+    return _analysis_cache.prune()
+
+
+# Research context beyond this many chars only adds prompt tokens (and latency)
+ANALYSIS_CONTEXT_CHARS = 3000
+
+ANALYSIS_MAX_TOKENS = 768  # Per clause; batched requests scale it by clause count
+
+# Fields of one clause analysis, as requested from K2
+ANALYSIS_SCHEMA = """{
+    "riskLevel": "high" | "medium" | "low",
+    "riskCategory": "financial" | "compliance" | "operational" | "reputational",
+    "explanation": "Plain-English explanation of what this clause means",
+    "concern": "What to watch out for — specific risks",
+    "suggestion": "Recommended changes or negotiation points",
+    "reasoning": "Detailed legal reasoning (for advanced users), at most 150 words"
+}"""
+
+# Fixed tail of every single-clause prompt, built once
+RESPONSE_FORMAT_TRAILER = (
+    "\nRespond with a single JSON object (no markdown fences) in this exact format:\n"
+    + ANALYSIS_SCHEMA
 )
 
 SYSTEM_PROMPT = """\
@@ -36,6 +63,42 @@ Be direct and practical. Write as if explaining to a friend, not a lawyer.\
 """
 
 
+RISK_LEVELS = frozenset(("high", "medium", "low"))
+RISK_CATEGORIES = frozenset(("financial", "compliance", "operational", "reputational"))
+
+# Stand-ins for fields K2 left out
+_DEFAULTS = {
+    "explanation": "No explanation provided",
+    "concern": "",
+    "suggestion": "Manual review recommended",
+    "reasoning": "",
+}
+
+
+def _normalize_analysis(result: dict) -> dict:
+    """Coerce a parsed K2 analysis into the shape the pipeline expects.
+
+    K2 occasionally answers with "HIGH", an off-list category or an empty
+    field; those would otherwise leak into scoring and the UI.
+    """
+    # Empty values count as missing, so drop them before layering over the defaults
+    result = {**_DEFAULTS, **{k: v for k, v in result.items() if v}}
+    risk_level = str(result.get("riskLevel", "")).lower()
+    result["riskLevel"] = risk_level if risk_level in RISK_LEVELS else "medium"
+    category = str(result.get("riskCategory", "")).lower()
+    result["riskCategory"] = category if category in RISK_CATEGORIES else "operational"
+    return result
+
+
+def _cache_key(
+    clause_text: str, clause_type: str, contract_type: str, additional_context: str
+) -> str:
+    return hashlib.blake2b(
+        f"{clause_text}|{clause_type}|{contract_type}|{additional_context[:500]}".encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
 async def analyze_clause_risk(
     clause_text: str,
     clause_type: str,
@@ -45,7 +108,7 @@ async def analyze_clause_risk(
     """Analyze a single clause using K2 Think for deep reasoning.
 
     Args:
-        clause_text: The raw clause text.
+        clause_text: The clause text, already trimmed to the caller's input budget.
         clause_type: Type of clause (e.g., "non-compete").
         contract_type: Type of contract (e.g., "NDA", "lease").
         additional_context: Extra context from research (Brave, Exa, RAG, context7).
@@ -53,29 +116,22 @@ async def analyze_clause_risk(
     Returns:
         Dict with riskLevel, riskCategory, explanation, concern, suggestion, reasoning.
     """
-    user_prompt = f"""Contract type: {contract_type}
-Clause type: {clause_type}
-
-Clause text:
-{clause_text}
-"""
-
-    if additional_context:
-        user_prompt += f"""
-Additional legal context and research:
-{additional_context}
-"""
-
-    user_prompt += """
-Respond in this exact JSON format:
-{
-    "riskLevel": "high" | "medium" | "low",
-    "riskCategory": "financial" | "compliance" | "operational" | "reputational",
-    "explanation": "Plain-English explanation of what this clause means",
-    "concern": "What to watch out for — specific risks",
-    "suggestion": "Recommended changes or negotiation points",
-    "reasoning": "Detailed legal reasoning (for advanced users)"
-}"""
+    clause_text = clause_text.strip()
+    additional_context = additional_context[:ANALYSIS_CONTEXT_CHARS].strip()
+    cache_key = _cache_key(clause_text, clause_type, contract_type, additional_context)
+    # SQLite I/O runs off the event loop so concurrent clauses never queue behind it
+    cached = await asyncio.to_thread(_analysis_cache.get_exact, cache_key)
+    if cached is not None:
+        return orjson.loads(cached)
+
+    context_block = (
+        f"\nAdditional legal context and research:\n{additional_context}\n"
+        if additional_context else ""
+    )
+    user_prompt = (
+        f"Contract type: {contract_type}\nClause type: {clause_type}\n\n"
+        f"Clause text:\n{clause_text}\n{context_block}{RESPONSE_FORMAT_TRAILER}"
+    )
 
     response = await k2.chat.completions.create(
         model="kimi-k2-instruct",
@@ -83,19 +139,17 @@ Respond in this exact JSON format:
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
-        max_tokens=1024,
+        # Output decode dominates latency; the fields fit comfortably in 768
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        response_format={"type": "json_object"},
     )
 
     content = response.choices[0].message.content or "{}"
 
-    # Parse JSON from response (handle markdown code blocks)
-    if "```json" in content:
-        content = content.split("```json")[1].split("```")[0]
-    elif "```" in content:
-        content = content.split("```")[1].split("```")[0]
-
     try:
-        return json.loads(content.strip())
+        result = parse_llm_json(content)
+        if not isinstance(result, dict):
+            raise json.JSONDecodeError("expected a JSON object", content, 0)
     except json.JSONDecodeError:
         return {
             "riskLevel": "medium",
@@ -105,3 +159,86 @@ Respond in this exact JSON format:
             "suggestion": "Manual review recommended",
             "reasoning": content,
         }
+
+    result = _normalize_analysis(result)
+    # Only well-formed analyses are cached; a parse failure should be retried next time
+    await asyncio.to_thread(
+        _analysis_cache.put, cache_key, "analysis", None, orjson.dumps(result).decode()
+    )
+    return result
+
+
+def _store_analyses(entries: list[tuple[str, dict]]) -> None:
+    """Cache several analyses in one worker-thread hop."""
+    for key, result in entries:
+        _analysis_cache.put(key, "analysis", None, orjson.dumps(result).decode())
+
+
+async def analyze_clauses_batch(
+    items: list[tuple[str, str, str]],
+    contract_type: str,
+) -> list[dict]:
+    """Analyze several clauses of one contract in a single K2 request.
+
+    The system prompt and instructions are sent once for the whole batch
+    instead of once per clause. Clauses already in the analysis cache are
+    answered from it and left out of the request.
+
+    Args:
+        items: (clause_text, clause_type, additional_context) per clause.
+        contract_type: Type of contract (e.g., "NDA", "lease").
+
+    Returns:
+        One analysis dict per item, in order.
+
+    Raises:
+        ValueError: K2's reply did not hold one well-formed result per clause.
+    """
+    items = [
+        (text.strip(), ctype, ctx[:ANALYSIS_CONTEXT_CHARS].strip()) for text, ctype, ctx in items
+    ]
+    keys = [_cache_key(text, ctype, contract_type, ctx) for text, ctype, ctx in items]
+    cached = await asyncio.to_thread(lambda: [_analysis_cache.get_exact(key) for key in keys])
+    results: list[dict | None] = [orjson.loads(c) if c is not None else None for c in cached]
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if len(missing) == 1:
+        text, ctype, ctx = items[missing[0]]
+        results[missing[0]] = await analyze_clause_risk(text, ctype, contract_type, ctx)
+    elif missing:
+        parts = [f"Contract type: {contract_type}\n"]
+        for n, i in enumerate(missing):
+            text, ctype, ctx = items[i]
+            parts.append(f"[{n}] Clause type: {ctype}\n\nClause text:\n{text}\n")
+            if ctx:
+                parts.append(f"Additional legal context and research:\n{ctx}\n")
+            parts.append("---\n")
+        parts.append(
+            f"Analyze each of the {len(missing)} clauses above. Respond with a single JSON "
+            'object (no markdown fences) of the form {"results": [...]}, holding one object '
+            f"per clause, in order, each in this exact format:\n{ANALYSIS_SCHEMA}"
+        )
+
+        response = await k2.chat.completions.create(
+            model="kimi-k2-instruct",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": "\n".join(parts)},
+            ],
+            max_tokens=ANALYSIS_MAX_TOKENS * len(missing),
+            response_format={"type": "json_object"},
+        )
+
+        content = response.choices[0].message.content or "{}"
+        parsed = parse_llm_json(content)
+        batch = parsed.get("results") if isinstance(parsed, dict) else parsed
+        if not isinstance(batch, list) or len(batch) != len(missing):
+            raise ValueError(f"expected {len(missing)} results from K2, got {content[:200]!r}")
+        if not all(isinstance(r, dict) for r in batch):
+            raise ValueError("K2 returned a non-object clause result")
+
+        for i, result in zip(missing, batch):
+            results[i] = _normalize_analysis(result)
+        await asyncio.to_thread(_store_analyses, [(keys[i], results[i]) for i in missing])
+
+    return results
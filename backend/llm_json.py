@@ -0,0 +1,35 @@
+"""Parse JSON out of LLM responses.
+
+Models often wrap JSON in a ```json (or bare ```) code fence, sometimes
+without the closing fence when the reply is cut off at max_tokens. One
+precompiled regex pulls out the fenced body in a single pass.
+"""
+
+import json
+import re
+
+import orjson
+
+# Body of a ```json / ``` fenced block (closing fence optional)
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+
+def parse_llm_json(output: str) -> dict | list:
+    """Parse JSON from an LLM response, stripping code fences if present.
+
+    Args:
+        output: Raw model output.
+
+    Returns:
+        The decoded JSON value.
+
+    Raises:
+        json.JSONDecodeError: The response did not contain valid JSON.
+    """
+    m = FENCE_RE.search(output)
+    payload = m.group(1) if m else output.strip()
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        # stdlib is more lenient (NaN/Infinity, lone surrogates)
+        return json.loads(payload)
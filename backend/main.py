@@ -1,19 +1,30 @@
 import asyncio
+import hashlib
 import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import fitz  # pymupdf
+import orjson
+import xxhash
 from convex import ConvexClient
 from dotenv import load_dotenv
-from fastapi import BackgroundTasks, FastAPI, File, Form, UploadFile
+from fastapi import FastAPI, File, Form, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 
 from pydantic import BaseModel
 
-from agent import run_contract_analysis
+from agent import keep_warm, prune_caches, run_contract_analysis
 from chat import chat_about_clause
-from report_generator import generate_pdf_report
+from http_clients import aclose as close_api_clients
+from pdf_extractor import extract_pdf_text
+from pdf_extractor import shutdown as shutdown_pdf_workers
+from report_generator import cached_pdf_report, prune_report_cache
+from semantic_cache import SemanticCache
+from vultr_rag import aclose as close_rag_client
 
 # Load .env from the backend directory regardless of cwd
 load_dotenv(Path(__file__).parent / ".env")
@@ -21,8 +32,53 @@ load_dotenv(Path(__file__).parent / ".env")
 # Directory for storing uploaded PDFs (served back for the PDF viewer)
 PDF_STORAGE_DIR = Path(__file__).parent / "pdf_storage"
 PDF_STORAGE_DIR.mkdir(exist_ok=True)
-
-app = FastAPI(title="ContractPilot Backend")
+REPORT_CACHE_DIR = PDF_STORAGE_DIR / "reports"
+# Rendered reports not downloaded for this long are deleted at startup
+REPORT_CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+
+# Extracted text (and OCR word boxes) by file hash, so retries and re-uploads
+# of the same document skip extraction and OCR entirely.
+TEXT_CACHE_TTL = 7 * 24 * 3600  # seconds
+_text_cache = SemanticCache("extracted_text", ttl=TEXT_CACHE_TTL)
+
+# Analyses run as tasks detached from the upload request. At most this many
+# run at once per worker; later ones wait (their review stays "pending").
+ANALYSIS_CONCURRENCY = int(os.environ.get("ANALYSIS_CONCURRENCY", 4))
+_analysis_slots = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+_analysis_tasks: set[asyncio.Task] = set()  # strong refs until each finishes
+
+
+def _prune_caches() -> None:
+    """Drop expired entries from every on-disk cache (blocking)."""
+    _text_cache.prune()
+    prune_caches()
+    prune_report_cache(REPORT_CACHE_DIR, REPORT_CACHE_MAX_AGE)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm K2 connections + caches in the background so the first review
+    # doesn't pay the cold-start cost, and keep them warm while idle.
+    warm_task = asyncio.create_task(keep_warm())
+    # Drop expired cache entries without delaying startup
+    prune_task = asyncio.create_task(asyncio.to_thread(_prune_caches))
+    yield
+    warm_task.cancel()
+    prune_task.cancel()
+    for task in _analysis_tasks:
+        task.cancel()
+    await asyncio.gather(*_analysis_tasks, return_exceptions=True)
+    await close_api_clients()
+    await close_rag_client()
+    shutdown_pdf_workers()
+
+
+# JSON bodies (chat answers, upload status) are serialized with orjson
+app = FastAPI(
+    title="ContractPilot Backend",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,46 +92,85 @@ app.add_middleware(
 convex = ConvexClient(os.environ.get("CONVEX_URL", ""))
 
 
-def extract_text(file_bytes: bytes, filename: str, use_ocr: bool) -> tuple[str, bool, list]:
-    """Extract text from a PDF or DOCX file. Returns (text, ocr_used, ocr_words).
+def extract_text(path: Path, filename: str, use_ocr: bool) -> tuple[str, bool, list]:
+    """Extract text from a PDF or DOCX file on disk. Returns (text, ocr_used, ocr_words).
 
-    For PDFs: uses PyMuPDF direct extraction, or Tesseract OCR if use_ocr is True.
+    For PDFs: uses PyMuPDF direct extraction. If use_ocr is True, pages without a
+    usable text layer are additionally OCR'd with Tesseract.
     For DOCX: uses python-docx (OCR is never needed).
     ocr_words is a list of word dicts with positions (empty if OCR not used).
     """
     if filename.lower().endswith(".docx"):
         from docx_extractor import extract_docx_text
 
-        return extract_docx_text(file_bytes), False, []
+        return extract_docx_text(path.read_bytes()), False, []
+
+    # PDF path — parsed once; with OCR toggled on, only pages lacking a text
+    # layer go through Tesseract, else the whole document is read directly
+    with fitz.open(path, filetype="pdf") as doc:
+        if use_ocr:
+            from ocr import ocr_pdf_with_positions
+
+            text, words = ocr_pdf_with_positions(doc)
+            return text, True, words
 
-    # PDF path — use Tesseract if user toggled OCR on
-    if use_ocr:
-        from ocr import ocr_pdf_with_positions
+        return extract_pdf_text(doc, path), False, []
 
-        text, words = ocr_pdf_with_positions(file_bytes)
-        return text, True, words
 
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    doc.close()
+def extract_text_cached(path: Path, filename: str, use_ocr: bool) -> tuple[str, bool, list]:
+    """extract_text, memoized on disk by file content and OCR flag."""
+    kind = "docx" if filename.lower().endswith(".docx") else "pdf"
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, xxhash.xxh3_128).hexdigest()
+    key = f"{kind}:{use_ocr:d}:{digest}"
+    cached = _text_cache.get_exact(key)
+    if cached is not None:
+        entry = orjson.loads(cached)
+        return entry["text"], entry["ocr_used"], entry["words"]
 
-    return text, False, []
+    text, ocr_used, words = extract_text(path, filename, use_ocr)
+    entry = {"text": text, "ocr_used": ocr_used, "words": words}
+    _text_cache.put(key, kind, None, orjson.dumps(entry).decode())
+    return text, ocr_used, words
 
 
-async def _run_analysis(review_id: str, pdf_text: str, pdf_bytes: bytes, user_id: str, ocr_used: bool, ocr_words: list = None):
+def _save_upload(upload: UploadFile) -> Path:
+    """Stream an upload into PDF_STORAGE_DIR in 1 MB chunks; returns the temp path."""
+    with tempfile.NamedTemporaryFile(
+        dir=PDF_STORAGE_DIR, suffix=".upload", delete=False
+    ) as f:
+        shutil.copyfileobj(upload.file, f, length=1 << 20)
+    return Path(f.name)
+
+
+async def _run_analysis(review_id: str, pdf_text: str, pdf_path: Path, user_id: str, ocr_used: bool, ocr_words: list = None):
     """Background task: run the full agent analysis pipeline."""
     try:
-        await run_contract_analysis(review_id, pdf_text, user_id, ocr_used, pdf_bytes, ocr_words or [])
+        async with _analysis_slots:
+            pdf_bytes = await asyncio.to_thread(pdf_path.read_bytes)
+            await run_contract_analysis(
+                review_id, pdf_text, user_id, ocr_used, pdf_bytes, ocr_words or []
+            )
+    except asyncio.CancelledError:
+        # Cancelled at shutdown, possibly before the pipeline started
+        print(f"Analysis cancelled for {review_id}")
+        await _mark_failed(review_id)
+        raise
     except Exception as e:
         import traceback
         print(f"Analysis failed for {review_id}: {e}")
         traceback.print_exc()
-        try:
-            convex.mutation("reviews:updateStatus", {"id": review_id, "status": "failed"})
-        except Exception:
-            pass
+        await _mark_failed(review_id)
+
+
+async def _mark_failed(review_id: str) -> None:
+    """Best-effort, shielded from cancellation: flag a review as failed."""
+    try:
+        await asyncio.shield(asyncio.to_thread(
+            convex.mutation, "reviews:updateStatus", {"id": review_id, "status": "failed"}
+        ))
+    except (Exception, asyncio.CancelledError):
+        pass
 
 
 @app.get("/health")
@@ -85,7 +180,6 @@ async def health():
 
 @app.post("/analyze")
 async def analyze_contract(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: str = Form("dev-user"),
     use_ocr: str = Form("false"),
@@ -102,30 +196,46 @@ async def analyze_contract(
                 status_code=400,
             )
 
-        file_bytes = await file.read()
-        print(f"Received file: {filename}, size: {len(file_bytes)} bytes")
-
-        # Extract text (OCR only applies to PDFs when toggled on by user)
-        ocr_flag = use_ocr.lower() in ("true", "1", "yes")
-        doc_text, ocr_used, ocr_words = extract_text(file_bytes, filename, ocr_flag)
-        print(f"Extracted {len(doc_text)} chars, ocr_used={ocr_used}, ocr_words={len(ocr_words)}")
-
-        # Create review in Convex
+        # Spool the upload to disk rather than holding it in memory; it is
+        # renamed to the review's PDF once the review exists
+        upload_path = await asyncio.to_thread(_save_upload, file)
         try:
-            review_id = convex.mutation(
-                "reviews:create",
-                {"userId": user_id, "filename": filename},
+            print(f"Received file: {filename}, size: {upload_path.stat().st_size} bytes")
+
+            # Extract text (OCR only applies to PDFs when toggled on by user)
+            ocr_flag = use_ocr.lower() in ("true", "1", "yes")
+            # PyMuPDF / Tesseract are CPU-bound — keep them off the event loop
+            doc_text, ocr_used, ocr_words = await asyncio.to_thread(
+                extract_text_cached, upload_path, filename, ocr_flag
+            )
+            print(
+                f"Extracted {len(doc_text)} chars, ocr_used={ocr_used}, "
+                f"ocr_words={len(ocr_words)}"
             )
-        except Exception:
-            # Convex not configured — return placeholder
-            return {"review_id": "demo", "status": "pending", "ocr_used": ocr_used}
 
-        # Store PDF for the viewer
-        pdf_path = PDF_STORAGE_DIR / f"{review_id}.pdf"
-        pdf_path.write_bytes(file_bytes)
+            # Create review in Convex
+            try:
+                review_id = await asyncio.to_thread(
+                    convex.mutation,
+                    "reviews:create",
+                    {"userId": user_id, "filename": filename},
+                )
+            except Exception:
+                # Convex not configured — return placeholder
+                return {"review_id": "demo", "status": "pending", "ocr_used": ocr_used}
+
+            # Store PDF for the viewer
+            pdf_path = PDF_STORAGE_DIR / f"{review_id}.pdf"
+            upload_path.replace(pdf_path)
+        finally:
+            upload_path.unlink(missing_ok=True)
 
         # Run analysis in background
-        background_tasks.add_task(_run_analysis, review_id, doc_text, file_bytes, user_id, ocr_used, ocr_words)
+        task = asyncio.create_task(
+            _run_analysis(review_id, doc_text, pdf_path, user_id, ocr_used, ocr_words)
+        )
+        _analysis_tasks.add(task)
+        task.add_done_callback(_analysis_tasks.discard)
 
         return {"review_id": review_id, "status": "pending", "ocr_used": ocr_used}
     except Exception as e:
@@ -142,10 +252,14 @@ async def get_pdf(review_id: str):
     pdf_path = PDF_STORAGE_DIR / f"{review_id}.pdf"
     if not pdf_path.exists():
         return Response(content=b"PDF not found", status_code=404)
-    return Response(
-        content=pdf_path.read_bytes(),
+    # Streamed from disk (sendfile where available); FileResponse also sets an
+    # ETag / Last-Modified from the file's mtime and size for revalidation.
+    return FileResponse(
+        pdf_path,
         media_type="application/pdf",
-        headers={"Content-Disposition": "inline; filename=contract.pdf"},
+        filename="contract.pdf",
+        content_disposition_type="inline",
+        headers={"Cache-Control": "private, max-age=3600"},
     )
 
 
@@ -153,19 +267,24 @@ async def get_pdf(review_id: str):
 async def get_report(review_id: str):
     """Download the PDF risk analysis report."""
     try:
-        review = convex.query("reviews:get", {"id": review_id})
-        clauses = convex.query("clauses:getByReview", {"reviewId": review_id})
+        review, clauses = await asyncio.gather(
+            asyncio.to_thread(convex.query, "reviews:get", {"id": review_id}),
+            asyncio.to_thread(convex.query, "clauses:getByReview", {"reviewId": review_id}),
+        )
     except Exception:
         return Response(content=b"Report not available", status_code=404)
 
     if not review or review.get("status") != "completed":
         return Response(content=b"Review not completed yet", status_code=202)
 
-    pdf_bytes = generate_pdf_report(review, clauses or [])
-    return Response(
-        content=pdf_bytes,
+    # WeasyPrint rendering is CPU-bound — keep it off the event loop
+    report_path = await asyncio.to_thread(
+        cached_pdf_report, review, clauses or [], REPORT_CACHE_DIR
+    )
+    return FileResponse(
+        report_path,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=contractpilot-report.pdf"},
+        filename="contractpilot-report.pdf",
     )
 
 
@@ -0,0 +1,94 @@
+"""Extract text from text-based PDF documents with PyMuPDF."""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz  # pymupdf
+
+# Plain reading-order text for the LLM: no dehyphenation (clause text must
+# still match the page text for highlighting) and no position sorting.
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_DEHYPHENATE
+# Pages slower than this switch the rest of the range to isolated extraction
+SLOW_PAGE_SECONDS = 0.5
+# Shorter documents are extracted inline; a process round trip costs more
+PARALLEL_MIN_PAGES = 8
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # spawn, not fork: extraction is called from worker threads of a process
+    # that also runs an event loop, and forking that state is unsafe.
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown() -> None:
+    """Stop the extraction worker processes (call on shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _extract_pages(doc: fitz.Document, start: int, stop: int) -> list[str]:
+    """Extract text of pages [start, stop) of an open PDF.
+
+    Some PDFs (typically large tagged ones) make every get_text call walk
+    document-wide structures. Once a page takes longer than SLOW_PAGE_SECONDS,
+    each remaining page is copied into a scratch document on its own and
+    extracted there, which skips that overhead.
+    """
+    parts: list[str] = []
+    isolate = False
+    for i in range(start, stop):
+        if isolate:
+            with fitz.open() as scratch:
+                scratch.insert_pdf(doc, from_page=i, to_page=i, links=False, annots=False)
+                parts.append(scratch[0].get_text("text", flags=PDF_TEXT_FLAGS, sort=False))
+            continue
+        t0 = time.perf_counter()
+        parts.append(doc[i].get_text("text", flags=PDF_TEXT_FLAGS, sort=False))
+        isolate = time.perf_counter() - t0 > SLOW_PAGE_SECONDS
+    return parts
+
+
+def _extract_page_range(path: Path, start: int, stop: int) -> list[str]:
+    """Worker entry point: documents can't be pickled, so each worker opens its own."""
+    with fitz.open(path, filetype="pdf") as doc:
+        return _extract_pages(doc, start, stop)
+
+
+def extract_pdf_text(doc: fitz.Document, path: Path) -> str:
+    """Extract all text from a PDF, splitting long documents across processes.
+
+    Args:
+        doc: The open PDF; short documents are read from it directly.
+        path: Where the same PDF is stored; worker processes for long
+            documents open it from there.
+
+    Returns:
+        Full extracted text, pages separated by a newline so the last line of
+        one page never runs into the first line of the next.
+    """
+    page_count = doc.page_count
+    if page_count < PARALLEL_MIN_PAGES:
+        return "\n".join(_extract_pages(doc, 0, page_count))
+
+    # One contiguous page range per worker
+    workers = min(os.cpu_count() or 1, page_count)
+    step = -(-page_count // workers)
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_page_range, path, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    return "\n".join(part for f in futures for part in f.result())
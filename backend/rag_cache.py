@@ -0,0 +1,109 @@
+"""Persistent exact-match cache in front of Vultr RAG lookups.
+
+Contracts reuse boilerplate heavily (NDAs, MSAs, leases from the same
+template), so many clauses ask the knowledge base the same question. Hits are
+keyed on the normalised clause text + heading only: a near-identical clause
+can differ in exactly the word (a cap, a carve-out) its legal context turns
+on. Only successful RAG responses are cached — errors are returned to the
+caller as-is.
+
+Concurrent misses for the same clause share one in-flight Vultr request, so
+repeated boilerplate analysed in parallel costs a single RAG call. Recent
+answers are also kept in a small in-memory LRU (with a TTL) in front of
+SQLite, so repeated chat turns about the same clause never touch disk.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+import httpx
+
+from semantic_cache import SemanticCache
+from vultr_rag import COLLECTION_ID, VULTR_API_KEY, fetch_legal_knowledge, query_legal_knowledge
+
+MEMORY_MAX_ENTRIES = 256
+MEMORY_TTL = 600.0  # seconds
+
+_cache = SemanticCache("rag")
+# exact key -> task fetching it; entries are removed when the fetch settles
+_in_flight: dict[str, asyncio.Task] = {}
+# exact key -> (stored_at, context), least recently used first
+_memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+_WS_RE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def _memory_get(key: str) -> str | None:
+    entry = _memory.get(key)
+    if entry is None:
+        return None
+    stored_at, context = entry
+    if time.monotonic() - stored_at > MEMORY_TTL:
+        del _memory[key]
+        return None
+    _memory.move_to_end(key)
+    return context
+
+
+def _memory_put(key: str, context: str) -> None:
+    _memory[key] = (time.monotonic(), context)
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_MAX_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def warm() -> None:
+    """Open the on-disk cache ahead of the first lookup."""
+    _cache.warm()
+
+
+async def cached_query(clause_text: str, clause_type: str) -> str:
+    """Drop-in replacement for query_legal_knowledge() with caching.
+
+    Args:
+        clause_text: The clause text to research.
+        clause_type: Type of clause (e.g., "non-compete").
+
+    Returns:
+        Legal context string from the cache or the knowledge base.
+    """
+    if not VULTR_API_KEY or not COLLECTION_ID:
+        return await query_legal_knowledge(clause_text, clause_type)
+
+    key = hashlib.sha1(f"{_normalize(clause_text)}\0{clause_type}".encode()).hexdigest()
+    cached = _memory_get(key)
+    if cached is not None:
+        return cached
+    # SQLite lookups run off the event loop
+    cached = await asyncio.to_thread(_cache.get_exact, key)
+    if cached is not None:
+        _memory_put(key, cached)
+        return cached
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_store(key, clause_text, clause_type))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # Shielded so one cancelled caller doesn't abort the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_store(key: str, clause_text: str, clause_type: str) -> str:
+    try:
+        context = await fetch_legal_knowledge(clause_text, clause_type)
+    except (httpx.HTTPError, KeyError) as e:
+        return f"RAG query failed: {e}"
+
+    _memory_put(key, context)
+    # SemanticCache locks internally; the SQLite commit runs in a worker thread
+    # so the event loop keeps serving other clauses meanwhile.
+    await asyncio.to_thread(_cache.put, key, COLLECTION_ID, None, context)
+    return context
@@ -4,6 +4,46 @@ Generates a styled risk analysis PDF from review + clause data.
 """
 
 import html
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+import xxhash
+
+REPORT_CSS = """
+body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+       margin: 40px; color: #1f2937; line-height: 1.5; }
+h1 { color: #111827; border-bottom: 2px solid #3b82f6; padding-bottom: 8px; }
+h2 { color: #374151; margin-top: 24px; }
+.score-box { display: inline-block; padding: 12px 24px; border-radius: 12px;
+             font-size: 32px; font-weight: bold; color: white; }
+.risk-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 12px; margin: 16px 0; }
+.risk-item { padding: 12px; border-radius: 8px; background: #f9fafb;
+             border: 1px solid #e5e7eb; }
+.risk-item .label { font-size: 12px; color: #6b7280; text-transform: uppercase; }
+.risk-item .value { font-size: 24px; font-weight: bold; }
+table { width: 100%; border-collapse: collapse; margin: 12px 0; }
+th, td { padding: 8px 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }
+th { background: #f9fafb; font-weight: 600; }
+.footer { margin-top: 40px; padding-top: 16px; border-top: 1px solid #e5e7eb;
+          color: #9ca3af; font-size: 12px; }
+"""
+
+
+@lru_cache(maxsize=1)
+def _stylesheet():
+    """Parse REPORT_CSS once and share one font configuration across reports.
+
+    Built on first use so importing this module never loads WeasyPrint.
+    """
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    return CSS(string=REPORT_CSS, font_config=font_config), font_config
 
 
 def _risk_color(score: int) -> str:
@@ -43,7 +83,7 @@ def generate_pdf_report(review: dict, clauses: list[dict]) -> bytes:
     filename = html.escape(review.get("filename", "document.pdf"))
 
     # Build clause cards HTML — group sub-clauses under parent headings
-    clause_cards = ""
+    card_parts: list[str] = []
     current_parent = None
     for clause in clauses:
         parent = clause.get("parentHeading")
@@ -51,7 +91,7 @@ def generate_pdf_report(review: dict, clauses: list[dict]) -> bytes:
         # Render parent group header when entering a new parent group
         if parent and parent != current_parent:
             current_parent = parent
-            clause_cards += (
+            card_parts.append(
                 f'<h4 style="margin-top:16px;margin-bottom:4px;color:#374151;'
                 f'font-size:14px;">{html.escape(parent)}</h4>'
             )
@@ -59,7 +99,9 @@ def generate_pdf_report(review: dict, clauses: list[dict]) -> bytes:
             current_parent = None
 
         indent = "margin-left:24px;border-left:3px solid #bfdbfe;" if parent else ""
-        clause_cards += f"""
+        concern = clause.get("concern")
+        suggestion = clause.get("suggestion")
+        card_parts.append(f"""
         <div style="border:1px solid #e5e7eb;border-radius:8px;padding:16px;margin-bottom:12px;{indent}">
             <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:8px;">
                 <strong>{html.escape(clause.get('clauseType', 'Clause'))}</strong>
@@ -67,50 +109,31 @@ def generate_pdf_report(review: dict, clauses: list[dict]) -> bytes:
             </div>
             <p style="color:#374151;margin:4px 0;"><strong>What this means:</strong>
                 {html.escape(clause.get('explanation', ''))}</p>
-            {"<p style='color:#dc2626;margin:4px 0;'><strong>Watch out:</strong> "
-             + html.escape(clause.get('concern', '')) + "</p>" if clause.get('concern') else ""}
-            {"<p style='color:#059669;margin:4px 0;'><strong>Suggestion:</strong> "
-             + html.escape(clause.get('suggestion', '')) + "</p>" if clause.get('suggestion') else ""}
+            {f"<p style='color:#dc2626;margin:4px 0;'><strong>Watch out:</strong> "
+             f"{html.escape(concern)}</p>" if concern else ""}
+            {f"<p style='color:#059669;margin:4px 0;'><strong>Suggestion:</strong> "
+             f"{html.escape(suggestion)}</p>" if suggestion else ""}
         </div>
-        """
+        """)
+    clause_cards = "".join(card_parts)
 
     # Build action items HTML
-    action_items_html = ""
-    for i, item in enumerate(review.get("actionItems", []), 1):
-        action_items_html += f"<li>{html.escape(item)}</li>"
+    action_items_html = "".join(
+        f"<li>{html.escape(item)}</li>" for item in review.get("actionItems", [])
+    )
 
     # Build key dates HTML
-    key_dates_html = ""
-    for kd in review.get("keyDates", []):
-        key_dates_html += (
-            f"<tr><td>{html.escape(kd.get('date', ''))}</td>"
-            f"<td>{html.escape(kd.get('label', ''))}</td>"
-            f"<td>{html.escape(kd.get('type', ''))}</td></tr>"
-        )
+    key_dates_html = "".join(
+        f"<tr><td>{html.escape(kd.get('date', ''))}</td>"
+        f"<td>{html.escape(kd.get('label', ''))}</td>"
+        f"<td>{html.escape(kd.get('type', ''))}</td></tr>"
+        for kd in review.get("keyDates", [])
+    )
 
     report_html = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-               margin: 40px; color: #1f2937; line-height: 1.5; }}
-        h1 {{ color: #111827; border-bottom: 2px solid #3b82f6; padding-bottom: 8px; }}
-        h2 {{ color: #374151; margin-top: 24px; }}
-        .score-box {{ display: inline-block; padding: 12px 24px; border-radius: 12px;
-                      font-size: 32px; font-weight: bold; color: white;
-                      background: {_risk_color(risk_score)}; }}
-        .risk-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 12px; margin: 16px 0; }}
-        .risk-item {{ padding: 12px; border-radius: 8px; background: #f9fafb;
-                      border: 1px solid #e5e7eb; }}
-        .risk-item .label {{ font-size: 12px; color: #6b7280; text-transform: uppercase; }}
-        .risk-item .value {{ font-size: 24px; font-weight: bold; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 12px 0; }}
-        th, td {{ padding: 8px 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }}
-        th {{ background: #f9fafb; font-weight: 600; }}
-        .footer {{ margin-top: 40px; padding-top: 16px; border-top: 1px solid #e5e7eb;
-                   color: #9ca3af; font-size: 12px; }}
-    </style>
 </head>
 <body>
     <h1>ContractPilot Risk Analysis</h1>
@@ -118,7 +141,7 @@ def generate_pdf_report(review: dict, clauses: list[dict]) -> bytes:
        <strong>Type:</strong> {contract_type}</p>
 
     <h2>Overall Risk Score</h2>
-    <div class="score-box">{risk_score}/100</div>
+    <div class="score-box" style="background:{_risk_color(risk_score)}">{risk_score}/100</div>
 
     <div class="risk-grid">
         <div class="risk-item">
@@ -163,4 +186,63 @@ def generate_pdf_report(review: dict, clauses: list[dict]) -> bytes:
 
     from weasyprint import HTML  # lazy import — requires pango/glib system libs
 
-    return HTML(string=report_html).write_pdf()
+    stylesheet, font_config = _stylesheet()
+    return HTML(string=report_html).write_pdf(stylesheets=[stylesheet], font_config=font_config)
+
+
+def cached_pdf_report(review: dict, clauses: list[dict], cache_dir: Path) -> Path:
+    """Return the path of the report PDF, rendering it only if not cached yet.
+
+    Reports are keyed by a hash of the full review and clause data, so any
+    change to either renders a fresh report while repeat downloads (and
+    concurrent polls) reuse the file.
+
+    Args:
+        review: Review data from Convex.
+        clauses: List of clause analysis results.
+        cache_dir: Directory holding rendered reports.
+
+    Returns:
+        Path to the rendered PDF.
+    """
+    digest = xxhash.xxh3_128()
+    digest.update(orjson.dumps(review, option=orjson.OPT_SORT_KEYS))
+    digest.update(orjson.dumps(clauses, option=orjson.OPT_SORT_KEYS))
+    path = cache_dir / f"{digest.hexdigest()}.pdf"
+    if path.exists():
+        # Count a download as use, so prune_report_cache keeps hot reports
+        os.utime(path)
+        return path
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    pdf_bytes = generate_pdf_report(review, clauses)
+    # Write then rename, so a concurrent reader never sees a partial file
+    with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+        f.write(pdf_bytes)
+    os.replace(f.name, path)
+    return path
+
+
+def prune_report_cache(cache_dir: Path, max_age: float) -> int:
+    """Delete cached reports (and stray temp files) unused for ``max_age`` seconds.
+
+    Every edit to a review renders a new report under a new hash, so without
+    this the directory only ever grows.
+
+    Returns:
+        Number of files removed.
+    """
+    if not cache_dir.is_dir():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in cache_dir.iterdir():
+        if path.suffix not in (".pdf", ".tmp"):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
@@ -0,0 +1,162 @@
+"""Two-tier (exact + semantic) response cache backed by SQLite.
+
+Exact tier: a caller-supplied key (usually a SHA-256 of the full prompt) maps
+straight to the stored value.
+Semantic tier: each entry also stores a hashed bag-of-words vector of a compact
+feature string. On an exact miss, the query vector is compared against every
+entry in the same namespace and the closest one is returned if its cosine
+similarity clears the threshold — so near-duplicate inputs (re-uploads,
+template contracts) reuse a prior result.
+
+Entries persist in SQLite so hits survive restarts; vectors are mirrored in
+memory per namespace so lookups never touch disk.
+"""
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+
+CACHE_DIR = Path(os.environ.get("CONTRACTPILOT_CACHE_DIR", Path(__file__).parent / "cache"))
+
+VECTOR_DIMS = 1024  # Hash buckets for the bag-of-words embedding
+MAX_ENTRIES = 2048  # Per-namespace cap on vectors held in memory
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def _bucket(token: str) -> tuple[int, float]:
+    """Map a token to a (bucket, sign) pair. Stable across processes."""
+    h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    return h % VECTOR_DIMS, (1.0 if h >> 63 else -1.0)
+
+
+def embed_text(text: str) -> dict[int, float]:
+    """Embed text as an L2-normalised, sparse hashed bag-of-words vector."""
+    vec: dict[int, float] = {}
+    for token in _TOKEN_RE.findall(text.lower()):
+        idx, sign = _bucket(token)
+        vec[idx] = vec.get(idx, 0.0) + sign
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if not norm:
+        return {}
+    return {k: v / norm for k, v in vec.items() if v}
+
+
+def cosine(a: dict[int, float], b: dict[int, float]) -> float:
+    """Cosine similarity of two normalised sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class SemanticCache:
+    """Exact + semantic cache stored in ``CACHE_DIR/<name>.sqlite3``."""
+
+    def __init__(
+        self,
+        name: str,
+        threshold: float = 0.95,
+        max_entries: int = MAX_ENTRIES,
+        ttl: float | None = None,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl  # seconds; exact lookups ignore older entries
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        # namespace -> list of (vector, value), oldest first
+        self._vectors: dict[str, list[tuple[dict[int, float], str]]] = {}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(CACHE_DIR / f"{self.name}.sqlite3", check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, vector TEXT, "
+                "value TEXT NOT NULL, created_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_namespace ON entries (namespace, created_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _namespace_vectors(self, namespace: str) -> list[tuple[dict[int, float], str]]:
+        rows = self._vectors.get(namespace)
+        if rows is None:
+            cur = self._db().execute(
+                "SELECT vector, value FROM entries WHERE namespace = ? AND vector IS NOT NULL "
+                "ORDER BY created_at DESC LIMIT ?",
+                (namespace, self.max_entries),
+            )
+            rows = [
+                ({int(k): v for k, v in orjson.loads(vector).items()}, value)
+                for vector, value in reversed(cur.fetchall())
+            ]
+            self._vectors[namespace] = rows
+        return rows
+
+    def warm(self) -> None:
+        """Open the database now rather than on the first lookup."""
+        with self._lock:
+            self._db()
+
+    def prune(self) -> int:
+        """Delete entries older than ``ttl``; returns how many were removed."""
+        if not self.ttl:
+            return 0
+        with self._lock:
+            cur = self._db().execute(
+                "DELETE FROM entries WHERE created_at < ?", (int(time.time() - self.ttl),)
+            )
+            self._db().commit()
+        return cur.rowcount
+
+    def get_exact(self, key: str) -> str | None:
+        """Return the value stored under ``key`` (if within ``ttl``), or None."""
+        min_created = int(time.time() - self.ttl) if self.ttl else 0
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value FROM entries WHERE key = ? AND created_at >= ?", (key, min_created)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_similar(self, namespace: str, vector: dict[int, float]) -> str | None:
+        """Return the closest value in ``namespace`` above the threshold, or None."""
+        if not vector:
+            return None
+        with self._lock:
+            best_score, best_value = 0.0, None
+            for entry_vec, value in self._namespace_vectors(namespace):
+                score = cosine(vector, entry_vec)
+                if score > best_score:
+                    best_score, best_value = score, value
+        return best_value if best_score >= self.threshold else None
+
+    def put(self, key: str, namespace: str, vector: dict[int, float] | None, value: str) -> None:
+        """Store ``value`` under ``key`` (and its vector for semantic lookups)."""
+        encoded = orjson.dumps(vector, option=orjson.OPT_NON_STR_KEYS).decode() if vector else None
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, vector, value, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, encoded, value, int(time.time())),
+            )
+            self._db().commit()
+            if vector and namespace in self._vectors:
+                rows = self._vectors[namespace]
+                rows.append((vector, value))
+                if len(rows) > self.max_entries:
+                    del rows[: len(rows) - self.max_entries]
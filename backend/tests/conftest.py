@@ -0,0 +1,9 @@
+"""Shared setup so backend modules import cleanly in tests."""
+
+import os
+import tempfile
+
+# Module-level clients and caches read these at import time. Keep the
+# on-disk caches out of the source tree.
+os.environ.setdefault("CONVEX_URL", "https://test.convex.cloud")
+os.environ.setdefault("CONTRACTPILOT_CACHE_DIR", tempfile.mkdtemp(prefix="contractpilot-test-"))
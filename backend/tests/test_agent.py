@@ -0,0 +1,267 @@
+"""Clause-analysis plumbing: K2 admission control, batching and dedup."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("convex")
+pytest.importorskip("dedalus_labs")
+pytest.importorskip("openai")
+httpx = pytest.importorskip("httpx")
+
+import agent  # noqa: E402
+from agent import AdmissionController, K2Batcher, _dedup_key  # noqa: E402
+from openai import RateLimitError  # noqa: E402
+
+
+def _rate_limit_error() -> RateLimitError:
+    request = httpx.Request("POST", "https://k2.test/v1/chat/completions")
+    return RateLimitError(
+        "rate limited", response=httpx.Response(429, request=request), body=None
+    )
+
+
+@pytest.fixture
+def k2_admission(monkeypatch):
+    """A fresh K2 limit of 8 for each test."""
+    admission = AdmissionController(8)
+    monkeypatch.setattr(agent, "K2_CONCURRENCY", 8)
+    monkeypatch.setattr(agent, "k2_admission", admission)
+    return admission
+
+
+# ── AdmissionController ────────────────────────────────────────────────
+
+
+async def test_admission_caps_concurrency():
+    admission = AdmissionController(2)
+    release = asyncio.Event()
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with admission:
+            peak = max(peak, admission.active)
+            await release.wait()
+
+    tasks = [asyncio.create_task(work()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert admission.active == 2
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert admission.active == 0
+
+
+async def test_raising_the_cap_admits_waiters():
+    admission = AdmissionController(1)
+    await admission.acquire()
+    waiter = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await admission.set_max(2)
+    await asyncio.wait_for(waiter, 1)
+    assert admission.active == 2
+
+
+async def test_shrinking_the_cap_never_preempts():
+    admission = AdmissionController(4)
+    for _ in range(3):
+        await admission.acquire()
+    await admission.set_max(1)
+    assert admission.active == 3
+
+    waiter = asyncio.create_task(admission.acquire())
+    for _ in range(2):
+        await admission.release()
+    await asyncio.sleep(0.01)
+    assert not waiter.done()  # still at the new cap of 1
+    await admission.release()
+    await asyncio.wait_for(waiter, 1)
+
+
+async def test_cap_never_drops_below_one():
+    admission = AdmissionController(1)
+    await admission.set_max(0)
+    assert admission.max_concurrent == 1
+
+
+# ── AIMD on K2 rate limits ─────────────────────────────────────────────
+
+
+async def test_rate_limit_halves_the_cap(k2_admission):
+    async def limited():
+        raise _rate_limit_error()
+
+    for expected in (4, 2, 1, 1):
+        with pytest.raises(RateLimitError):
+            await agent._with_k2_admission(limited)
+        assert k2_admission.max_concurrent == expected
+    assert k2_admission.active == 0
+
+
+async def test_successes_recover_one_slot_each(k2_admission):
+    async def limited():
+        raise _rate_limit_error()
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(RateLimitError):
+        await agent._with_k2_admission(limited)
+    assert k2_admission.max_concurrent == 4
+
+    for expected in (5, 6, 7, 8, 8):
+        assert await agent._with_k2_admission(ok) == "ok"
+        assert k2_admission.max_concurrent == expected
+
+
+async def test_other_errors_leave_the_cap_alone(k2_admission):
+    async def broken():
+        raise ValueError("bad JSON")
+
+    with pytest.raises(ValueError):
+        await agent._with_k2_admission(broken)
+    assert k2_admission.max_concurrent == 8
+
+
+# ── K2Batcher ──────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def fake_k2(monkeypatch, k2_admission):
+    """Record K2 calls; each clause's analysis echoes its text."""
+    calls = {"batches": [], "single": [], "gate": None}
+
+    async def analyze_clauses_batch(items, contract_type):
+        calls["batches"].append((contract_type, [text for text, _, _ in items]))
+        if calls["gate"] is not None:
+            await calls["gate"].wait()
+        return [{"clause": text} for text, _, _ in items]
+
+    async def analyze_clause_risk(clause_text, clause_type, contract_type, context):
+        calls["single"].append(clause_text)
+        return {"clause": clause_text}
+
+    monkeypatch.setattr(agent, "analyze_clauses_batch", analyze_clauses_batch)
+    monkeypatch.setattr(agent, "analyze_clause_risk", analyze_clause_risk)
+    return calls
+
+
+def _analyze(batcher: K2Batcher, text: str, contract_type: str = "NDA"):
+    return asyncio.create_task(batcher.analyze(text, "Term", contract_type, ""))
+
+
+async def test_full_batch_flushes_without_waiting(fake_k2):
+    batcher = K2Batcher(batch_size=3, window=60)
+    tasks = [_analyze(batcher, f"clause {i}") for i in range(3)]
+    results = await asyncio.wait_for(asyncio.gather(*tasks), 1)
+
+    assert results == [{"clause": f"clause {i}"} for i in range(3)]
+    assert fake_k2["batches"] == [("NDA", ["clause 0", "clause 1", "clause 2"])]
+
+
+async def test_partial_batch_flushes_after_window(fake_k2):
+    batcher = K2Batcher(batch_size=10, window=0.02)
+    tasks = [_analyze(batcher, "a"), _analyze(batcher, "b")]
+    await asyncio.sleep(0)
+    assert fake_k2["batches"] == []
+
+    results = await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert results == [{"clause": "a"}, {"clause": "b"}]
+    assert fake_k2["batches"] == [("NDA", ["a", "b"])]
+
+
+async def test_overflow_starts_a_new_batch(fake_k2):
+    batcher = K2Batcher(batch_size=2, window=0.02)
+    tasks = [_analyze(batcher, text) for text in "abc"]
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert fake_k2["batches"] == [("NDA", ["a", "b"]), ("NDA", ["c"])]
+
+
+async def test_contract_types_are_batched_separately(fake_k2):
+    batcher = K2Batcher(batch_size=2, window=0.02)
+    tasks = [_analyze(batcher, "a", "NDA"), _analyze(batcher, "b", "Lease")]
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert sorted(fake_k2["batches"]) == [("Lease", ["b"]), ("NDA", ["a"])]
+
+
+async def test_failed_batch_retries_clauses_individually(fake_k2, monkeypatch):
+    async def malformed(items, contract_type):
+        raise ValueError("batch reply is not a JSON array")
+
+    monkeypatch.setattr(agent, "analyze_clauses_batch", malformed)
+    batcher = K2Batcher(batch_size=2, window=60)
+    results = await asyncio.wait_for(
+        asyncio.gather(_analyze(batcher, "a"), _analyze(batcher, "b")), 1
+    )
+    assert results == [{"clause": "a"}, {"clause": "b"}]
+    assert sorted(fake_k2["single"]) == ["a", "b"]
+
+
+async def test_rate_limited_batch_fails_every_caller(fake_k2, monkeypatch, k2_admission):
+    async def limited(items, contract_type):
+        raise _rate_limit_error()
+
+    monkeypatch.setattr(agent, "analyze_clauses_batch", limited)
+    batcher = K2Batcher(batch_size=2, window=60)
+    results = await asyncio.wait_for(
+        asyncio.gather(_analyze(batcher, "a"), _analyze(batcher, "b"), return_exceptions=True),
+        1,
+    )
+    assert all(isinstance(r, RateLimitError) for r in results)
+    assert fake_k2["single"] == []  # no per-clause retries into a rate limit
+    assert k2_admission.max_concurrent == 4
+
+
+async def test_cancelled_caller_does_not_break_its_batch(fake_k2):
+    fake_k2["gate"] = asyncio.Event()
+    batcher = K2Batcher(batch_size=3, window=60)
+    tasks = [_analyze(batcher, text) for text in "abc"]
+    await asyncio.sleep(0.01)  # batch sent, K2 reply held at the gate
+    tasks[1].cancel()
+    fake_k2["gate"].set()
+
+    results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+    assert results[0] == {"clause": "a"}
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert results[2] == {"clause": "c"}
+
+
+async def test_caller_cancelled_before_flush(fake_k2):
+    batcher = K2Batcher(batch_size=10, window=0.02)
+    first, second = _analyze(batcher, "a"), _analyze(batcher, "b")
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await asyncio.wait_for(second, 1) == {"clause": "b"}
+    assert first.cancelled()
+
+
+# ── In-contract dedup ──────────────────────────────────────────────────
+
+PREAMBLE = (
+    "Notwithstanding anything to the contrary in this Agreement, and subject to "
+    "the limitations set out elsewhere herein, the parties agree as follows: "
+) * 8
+
+
+def test_shared_preamble_does_not_collapse_clauses():
+    cap = (PREAMBLE + "liability is capped at the fees paid in the prior 12 months.").lower()
+    uncapped = (PREAMBLE + "liability for gross negligence is unlimited.").lower()
+    assert _dedup_key("Limitation of Liability", cap) != _dedup_key(
+        "Limitation of Liability", uncapped
+    )
+
+
+def test_same_text_under_different_headings_is_distinct():
+    text = "each party shall bear its own costs."
+    assert _dedup_key("Expenses", text) != _dedup_key("Attorneys' Fees", text)
+
+
+def test_exact_repeat_ignores_case_and_whitespace():
+    a = "Each party shall bear\n  its own costs.".lower()
+    b = "Each  party shall bear its own costs. ".lower()
+    assert _dedup_key("Expenses", a) == _dedup_key(" expenses ", b)
@@ -0,0 +1,100 @@
+"""Clause splitting: the line-start heading scanner against the old re.split."""
+
+import re
+
+import pytest
+
+# tools pulls in the K2 and RAG clients
+pytest.importorskip("dotenv")
+pytest.importorskip("openai")
+pytest.importorskip("dedalus_labs")
+pytest.importorskip("httpx")
+
+from tools import _scan_headings, extract_clauses  # noqa: E402
+
+# The split pattern extract_clauses used before _scan_headings replaced it
+_OLD_SPLIT_RE = re.compile(
+    r"(?:^|\n)"
+    r"(?="
+    r"\d+\.\d+(?:\.\d+)*[\.\)]*\s"
+    r"|\d+[\.\)]\s"
+    r"|Section\s+\d"
+    r"|ARTICLE\s+[IVX\d]"
+    r"|[A-Z][A-Z\s]{3,}:"
+    r")"
+)
+
+NDA = """MUTUAL NON-DISCLOSURE AGREEMENT
+This Agreement is entered into as of January 1, 2025 between Acme Corp and Beta LLC.
+1. Definitions. "Confidential Information" means any non-public information.
+2. Obligations. The Receiving Party shall hold Confidential Information in confidence
+and shall not disclose it to any third party, except as permitted in Section 3.
+3) Exceptions. Information that is publicly available is not confidential.
+4. Term. This Agreement remains in effect for 2 years.
+IN WITNESS WHEREOF: the parties have signed below.
+"""
+
+MSA = """MASTER SERVICES AGREEMENT
+
+ARTICLE I
+DEFINITIONS
+1.1 "Services" means the services described in each Statement of Work.
+1.2 "Deliverables" means work product provided under a Statement of Work.
+
+ARTICLE II
+PAYMENT
+2.1. Fees. Customer shall pay all fees within 30 days of invoice.
+2.2) Late Payment. Overdue amounts accrue interest at 1.5% per month.
+2.2.1 Disputed invoices must be raised within 10 days.
+
+ARTICLE 3
+LIABILITY
+Section 3 Limitation. Neither party is liable for indirect damages.
+Section 10 Cap. Liability is capped at fees paid in the prior 12 months.
+"""
+
+LEASE = """1. PREMISES: Landlord leases to Tenant the premises at 12 Main Street.
+2. RENT: Tenant shall pay $2,000 per month, due on the first of each month,
+   as set out in Section 4 below. Payments made after 2. days are late.
+3. SECURITY DEPOSIT: Tenant shall deposit $4,000 with Landlord.
+4. USE: The premises shall be used as a private residence only.
+lowercase line that is not a heading: it must stay attached.
+5. TERMINATION: Either party may terminate on 60 days' written notice.
+"""
+
+NO_HEADINGS = """This letter confirms our agreement. You will provide consulting services
+as requested, and we will pay you at the agreed hourly rate within 30 days.
+
+Either of us may end this arrangement at any time with written notice.
+"""
+
+CRLF = MSA.replace("\n", "\r\n")
+
+
+def _old_sections(text: str) -> list[str]:
+    return [s.strip() for s in _OLD_SPLIT_RE.split(text) if s.strip()]
+
+
+def _new_sections(text: str) -> list[str]:
+    return [s.strip() for s in _scan_headings(text) if s.strip()]
+
+
+@pytest.mark.parametrize("text", [NDA, MSA, LEASE, NO_HEADINGS, CRLF, "", "\n\n"])
+def test_scan_headings_matches_old_split(text):
+    assert _new_sections(text) == _old_sections(text)
+
+
+def test_scan_headings_covers_the_whole_text():
+    assert "".join(_scan_headings(MSA)) == MSA
+
+
+def test_heading_mid_line_does_not_split():
+    sections = _new_sections(NDA)
+    assert any("except as permitted in Section 3." in s for s in sections)
+    assert not any(s.startswith("Section 3") for s in sections)
+
+
+def test_extract_clauses_splits_at_headings():
+    headings = [c["heading"] for c in extract_clauses(LEASE)]
+    assert len(headings) == 5
+    assert headings[0].startswith("1. PREMISES")
@@ -0,0 +1,77 @@
+"""Boilerplate triage: which clauses may skip the K2 call."""
+
+import pytest
+
+from triage import LONG_CLAUSE_CHARS, has_risk_markers, predict_low_risk
+
+COUNTERPARTS = (
+    "This Agreement may be executed in counterparts, each of which shall be "
+    "deemed an original and all of which together shall constitute one instrument."
+)
+
+
+@pytest.mark.parametrize(
+    "heading",
+    ["Counterparts", "Severability", "Headings", "Captions", "Electronic Signatures",
+     "Further Assurances", "12. COUNTERPARTS"],
+)
+def test_boilerplate_heading_is_low_risk(heading):
+    assert predict_low_risk(heading, COUNTERPARTS) == (True, 0.95)
+
+
+@pytest.mark.parametrize(
+    "heading",
+    ["Amendments", "Notices", "Waiver", "Entire Agreement", "Assignment",
+     "Governing Law", "Indemnification"],
+)
+def test_other_headings_are_never_triaged(heading):
+    assert predict_low_risk(heading, COUNTERPARTS) == (False, 0.0)
+
+
+def test_amendment_at_sole_discretion_is_not_triaged():
+    text = "Provider may amend these terms at its sole discretion."
+    assert predict_low_risk("Amendments", text) == (False, 0.0)
+    assert has_risk_markers(text)
+
+
+def test_each_risk_marker_lowers_confidence():
+    one = COUNTERPARTS + " Each party waives any objection to electronic delivery."
+    is_low, confidence = predict_low_risk("Counterparts", one)
+    assert is_low
+    assert confidence == pytest.approx(0.65)
+
+    two = one + " Liability for any defect in delivery is unlimited."
+    assert predict_low_risk("Counterparts", two) == (False, pytest.approx(0.35))
+
+
+def test_long_boilerplate_clause_earns_less_trust():
+    text = (COUNTERPARTS + " ") * (LONG_CLAUSE_CHARS // len(COUNTERPARTS) + 1)
+    assert len(text) > LONG_CLAUSE_CHARS
+    assert predict_low_risk("Counterparts", text) == (True, pytest.approx(0.85))
+
+
+def test_hidden_penalty_in_severability_is_analyzed():
+    text = (
+        "If any provision is held invalid, the remainder survives; provided that "
+        "Customer shall pay liquidated damages and indemnify Provider for any loss."
+    )
+    is_low, _ = predict_low_risk("Severability", text)
+    assert not is_low
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Provider may change the fees at any time.",
+        "The license may be revoked without prior notice.",
+        "Landlord may modify the rules unilaterally.",
+        "Any deposit is forfeited on a notice of default.",
+        "Tenant hereby waives its right to a jury trial.",
+    ],
+)
+def test_risk_markers(text):
+    assert has_risk_markers(text)
+
+
+def test_plain_boilerplate_has_no_risk_markers():
+    assert not has_risk_markers(COUNTERPARTS)
@@ -7,14 +7,56 @@ from the type hints and docstrings.
 import base64
 import json
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
 import fitz
+import xxhash
 
 from k2_client import analyze_clause_risk
-from ocr import ocr_pdf
+from llm_json import parse_llm_json
 from vultr_rag import query_legal_knowledge
 
 
+# Section headings that start a new clause at the beginning of a line:
+#   "1.1", "2.14" (decimal numbering — common in legal docs)
+#   "1.", "2)" (single-level numbering)
+#   "Section 1", "ARTICLE I"
+#   "ALL CAPS HEADING:"
+_CLAUSE_HEADING_RE = re.compile(
+    r"\d+\.\d+(?:\.\d+)*[\.\)]*\s"     # 1.1, 2.14, 1.2.3 (decimal)
+    r"|\d+[\.\)]\s"                      # 1., 2) (single-level)
+    r"|Section\s+\d"                      # Section 1
+    r"|ARTICLE\s+[IVX\d]"                # ARTICLE I, ARTICLE 1
+    r"|[A-Z][A-Z\s]{3,}:"                # ALL CAPS HEADING:
+)
+# Every heading form starts with a digit or a capital letter
+_HEADING_FIRST_CHARS = frozenset("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_NUMBER_ONLY_HEADING_RE = re.compile(r"^\d+[\.\d]*[\.\)]*$")  # "1.2", "3)"
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\n+")
+
+
+def _scan_headings(text: str) -> list[str]:
+    """Split text into sections at every line that starts with a heading.
+
+    Jumps from newline to newline and only tries the heading pattern where a
+    line starts with a digit or capital, instead of letting a split regex
+    attempt its lookahead at every position of the document.
+    """
+    bounds = [0]
+    heading_at = _CLAUSE_HEADING_RE.match
+    end = len(text)
+    pos = text.find("\n")
+    while pos != -1:
+        start = pos + 1
+        if start < end and text[start] in _HEADING_FIRST_CHARS and heading_at(text, start):
+            bounds.append(start)
+        pos = text.find("\n", start)
+    bounds.append(end)
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
 def extract_clauses(contract_text: str) -> list[dict]:
     """Extract individual clauses from a contract's full text.
 
@@ -28,22 +70,7 @@ def extract_clauses(contract_text: str) -> list[dict]:
         List of dicts with 'text' and 'heading' for each clause.
     """
     clauses = []
-    # Split on common section patterns:
-    #   "1.1", "2.14" (decimal numbering — common in legal docs)
-    #   "1.", "2)" (single-level numbering)
-    #   "Section 1", "ARTICLE I"
-    #   "ALL CAPS HEADING:"
-    pattern = (
-        r"(?:^|\n)"
-        r"(?="
-        r"\d+\.\d+(?:\.\d+)*[\.\)]*\s"   # 1.1, 2.14, 1.2.3 (decimal)
-        r"|\d+[\.\)]\s"                    # 1., 2) (single-level)
-        r"|Section\s+\d"                    # Section 1
-        r"|ARTICLE\s+[IVX\d]"              # ARTICLE I, ARTICLE 1
-        r"|[A-Z][A-Z\s]{3,}:"              # ALL CAPS HEADING:
-        r")"
-    )
-    sections = re.split(pattern, contract_text)
+    sections = _scan_headings(contract_text)
 
     for section in sections:
         section = section.strip()
@@ -54,16 +81,16 @@ def extract_clauses(contract_text: str) -> list[dict]:
         # combine with the next line to form a descriptive heading
         lines = section.split("\n", 2)
         heading = lines[0].strip()[:100]
-        if re.match(r"^\d+[\.\d]*[\.\)]*$", heading) and len(lines) > 1:
+        if _NUMBER_ONLY_HEADING_RE.match(heading) and len(lines) > 1:
             next_line = lines[1].strip()[:80]
             heading = f"{heading} {next_line}"[:100]
         text = section[:3000]  # Cap clause length
 
         clauses.append({"heading": heading, "text": text})
 
-    # If no sections found, split by double newlines
+    # If no sections found, split on blank lines (runs count as one break)
     if not clauses:
-        paragraphs = contract_text.split("\n\n")
+        paragraphs = _PARAGRAPH_BREAK_RE.split(contract_text)
         for i, para in enumerate(paragraphs):
             para = para.strip()
             if len(para) < 30:
@@ -183,7 +210,7 @@ async def extract_clauses_k2(contract_text: str) -> list[dict]:
         List of dicts with 'text' and 'heading' for each clause.
         Sub-clause entries also have 'parentHeading' and 'subClauseIndex'.
     """
-    from k2_client import k2
+    from http_clients import k2
 
     # ── Short documents: K2 single-pass (existing proven approach) ────
     if len(contract_text) <= 6000:
@@ -213,13 +240,7 @@ async def extract_clauses_k2(contract_text: str) -> list[dict]:
                 max_tokens=2048,
             )
             content = response.choices[0].message.content or "[]"
-
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-
-            clauses = json.loads(content.strip())
+            clauses = parse_llm_json(content)
 
             if isinstance(clauses, list) and len(clauses) > 0:
                 validated = []
@@ -278,13 +299,7 @@ async def extract_clauses_k2(contract_text: str) -> list[dict]:
             max_tokens=512,
         )
         content = response.choices[0].message.content or "{}"
-
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-
-        filter_result = json.loads(content.strip())
+        filter_result = parse_llm_json(content)
         keep_indices = set(filter_result.get("keep", range(len(expanded))))
 
         filtered = [expanded[i] for i in range(len(expanded)) if i in keep_indices]
@@ -298,6 +313,20 @@ async def extract_clauses_k2(contract_text: str) -> list[dict]:
     return _cap_clauses(expanded)
 
 
+# Contract types in precedence order: the first type with any term present
+# in the opening text wins.
+_CONTRACT_TYPE_TERMS = (
+    ("NDA", ("non-disclosure", "nda", "confidential information")),
+    ("Employment Agreement", ("employment", "employee", "employer", "at-will")),
+    ("Lease Agreement", ("lease", "landlord", "tenant", "premises", "rent")),
+    ("Freelance/Contractor Agreement", ("freelance", "independent contractor", "scope of work")),
+    ("Service Agreement", ("service agreement", "services", "service level")),
+    ("Purchase Agreement", ("purchase", "buyer", "seller", "sale")),
+    ("Partnership Agreement", ("partnership", "joint venture")),
+    ("License Agreement", ("license", "licensor", "licensee")),
+)
+
+
 def classify_contract(contract_text: str) -> str:
     """Classify the type of contract based on its content.
 
@@ -307,29 +336,45 @@ def classify_contract(contract_text: str) -> str:
     Returns:
         Contract type string (e.g., "NDA", "Employment Agreement", "Lease").
     """
-    text_lower = contract_text[:5000].lower()
-
-    if any(term in text_lower for term in ["non-disclosure", "nda", "confidential information"]):
-        return "NDA"
-    elif any(term in text_lower for term in ["employment", "employee", "employer", "at-will"]):
-        return "Employment Agreement"
-    elif any(term in text_lower for term in ["lease", "landlord", "tenant", "premises", "rent"]):
-        return "Lease Agreement"
-    elif any(term in text_lower for term in ["freelance", "independent contractor", "scope of work"]):
-        return "Freelance/Contractor Agreement"
-    elif any(term in text_lower for term in ["service agreement", "services", "service level"]):
-        return "Service Agreement"
-    elif any(term in text_lower for term in ["purchase", "buyer", "seller", "sale"]):
-        return "Purchase Agreement"
-    elif any(term in text_lower for term in ["partnership", "joint venture"]):
-        return "Partnership Agreement"
-    elif any(term in text_lower for term in ["license", "licensor", "licensee"]):
-        return "License Agreement"
-    else:
-        return "General Contract"
-
-
-def categorize_risk(clause_text: str, clause_type: str) -> dict:
+    return _classify_head(contract_text[:5000])
+
+
+@lru_cache(maxsize=256)
+def _classify_head(head: str) -> str:
+    """classify_contract on the opening text, memoized (it is deterministic)."""
+    text_lower = head.lower()
+
+    for contract_type, terms in _CONTRACT_TYPE_TERMS:
+        for term in terms:
+            if term in text_lower:
+                return contract_type
+    return "General Contract"
+
+
+# (scope, terms, category, rationale) in precedence order. "type" rules look
+# at the clause type/heading, "text" rules at the clause body; the first rule
+# with a matching term decides.
+_RISK_RULES = (
+    ("type", ("liability", "payment", "penalty", "damages", "fee", "cost"),
+     "financial", "Direct monetary impact"),
+    ("text", ("liquidated damages", "cap on liability", "indemnif"),
+     "financial", "Financial exposure clause"),
+    ("type", ("non-compete", "compliance", "privacy", "data", "regulatory"),
+     "compliance", "Regulatory or legal compliance risk"),
+    ("type", ("exclusivity", "assignment", "ip", "termination", "non-solicit"),
+     "operational", "Restricts operational freedom"),
+    ("type", ("confidential", "non-disparage", "publicity"),
+     "reputational", "Reputation or brand risk"),
+    ("text", ("penalt", "fine", "fee", "cost", "payment"),
+     "financial", "Contains financial terms"),
+    ("text", ("shall not", "restricted", "prohibited", "exclusive"),
+     "operational", "Contains operational restrictions"),
+)
+
+
+def categorize_risk(
+    clause_text: str, clause_type: str, clause_text_lower: str | None = None
+) -> dict:
     """Assign risk category per the MetricStream framework.
 
     Categories:
@@ -341,29 +386,26 @@ def categorize_risk(clause_text: str, clause_type: str) -> dict:
     Args:
         clause_text: The clause text.
         clause_type: The type of clause.
+        clause_text_lower: clause_text already lowercased, if the caller has it.
 
     Returns:
         Dict with category and rationale.
     """
     ct = clause_type.lower()
-    text = clause_text.lower()
-
-    if any(term in ct for term in ["liability", "payment", "penalty", "damages", "fee", "cost"]):
-        return {"category": "financial", "rationale": "Direct monetary impact"}
-    elif any(term in text for term in ["liquidated damages", "cap on liability", "indemnif"]):
-        return {"category": "financial", "rationale": "Financial exposure clause"}
-    elif any(term in ct for term in ["non-compete", "compliance", "privacy", "data", "regulatory"]):
-        return {"category": "compliance", "rationale": "Regulatory or legal compliance risk"}
-    elif any(term in ct for term in ["exclusivity", "assignment", "ip", "termination", "non-solicit"]):
-        return {"category": "operational", "rationale": "Restricts operational freedom"}
-    elif any(term in ct for term in ["confidential", "non-disparage", "publicity"]):
-        return {"category": "reputational", "rationale": "Reputation or brand risk"}
-    elif any(term in text for term in ["penalt", "fine", "fee", "cost", "payment"]):
-        return {"category": "financial", "rationale": "Contains financial terms"}
-    elif any(term in text for term in ["shall not", "restricted", "prohibited", "exclusive"]):
-        return {"category": "operational", "rationale": "Contains operational restrictions"}
-    else:
-        return {"category": "operational", "rationale": "General operational clause"}
+    text = clause_text_lower  # lowercased clause body, built on first use
+
+    for scope, terms, category, rationale in _RISK_RULES:
+        if scope == "type":
+            target = ct
+        else:
+            if text is None:
+                text = clause_text.lower()
+            target = text
+        for term in terms:
+            if term in target:
+                return {"category": category, "rationale": rationale}
+
+    return {"category": "operational", "rationale": "General operational clause"}
 
 
 def compute_risk_breakdown(clause_results_json: str) -> str:
@@ -519,6 +561,11 @@ def format_review_report(
     }
 
 
+OCR_CACHE_SIZE = 16  # OCR'd documents kept in memory, by content hash
+_ocr_cache: OrderedDict[str, str] = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+
 def ocr_document(pdf_base64: str) -> str:
     """Extract text from a scanned PDF using Tesseract OCR.
 
@@ -531,7 +578,21 @@ def ocr_document(pdf_base64: str) -> str:
         Extracted text from the scanned document.
     """
     pdf_bytes = base64.b64decode(pdf_base64)
-    return ocr_pdf(pdf_bytes)
+    key = xxhash.xxh3_128_hexdigest(pdf_bytes)
+    with _ocr_cache_lock:
+        if key in _ocr_cache:
+            _ocr_cache.move_to_end(key)
+            return _ocr_cache[key]
+
+    from ocr import ocr_pdf  # lazy import — pytesseract/PIL load only when OCR runs
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        text = ocr_pdf(doc)
+    with _ocr_cache_lock:
+        _ocr_cache[key] = text
+        if len(_ocr_cache) > OCR_CACHE_SIZE:
+            _ocr_cache.popitem(last=False)
+    return text
 
 
 def _expand_to_paragraph(page, start_rect, clause_text: str) -> list[dict]:
@@ -659,6 +720,20 @@ def extract_clause_positions(pdf_bytes: bytes, clauses: list[dict]) -> list[dict
     return positions
 
 
+def _ocr_prefix_index(ocr_words: list[dict]) -> dict[str, list[int]]:
+    """Map every 1-4 char lowercase word prefix to the OCR word indices having it.
+
+    ``word.startswith(p)`` for a prefix of up to 4 chars is then a single
+    dict lookup, and each clause only visits the positions that can match.
+    """
+    index: dict[str, list[int]] = {}
+    for k, w in enumerate(ocr_words):
+        text = w["text"].lower()
+        for n in range(1, min(len(text), 4) + 1):
+            index.setdefault(text[:n], []).append(k)
+    return index
+
+
 def match_clauses_to_ocr_boxes(
     clauses: list[dict],
     ocr_words: list[dict],
@@ -683,6 +758,7 @@ def match_clauses_to_ocr_boxes(
         page_dims[i] = {"width": doc[i].rect.width, "height": doc[i].rect.height}
     doc.close()
 
+    prefix_index = _ocr_prefix_index(ocr_words)
     positions = []
 
     for clause in clauses:
@@ -695,17 +771,23 @@ def match_clauses_to_ocr_boxes(
             })
             continue
 
-        # Sliding window: match first 8 words of clause against OCR words
+        # Sliding window: match first 8 words of clause against OCR words.
+        # Instead of scoring every window, walk the OCR positions whose word
+        # starts with each target prefix and credit the window they imply.
         target = clause_words_lower[:8]
+        n_windows = len(ocr_words) - len(target)
+        scores: dict[int, int] = {}
+        for j, tw in enumerate(target):
+            for k in prefix_index.get(tw[:4], ()):
+                i = k - j
+                if 0 <= i < n_windows:
+                    scores[i] = scores.get(i, 0) + 1
+
+        # Highest score wins; ties go to the earliest window
         best_idx = -1
         best_score = 0
-
-        for i in range(len(ocr_words) - len(target)):
-            score = 0
-            for j, tw in enumerate(target):
-                if i + j < len(ocr_words) and ocr_words[i + j]["text"].lower().startswith(tw[:4]):
-                    score += 1
-            if score > best_score:
+        for i, score in scores.items():
+            if score > best_score or (score == best_score and i < best_idx):
                 best_score = score
                 best_idx = i
 
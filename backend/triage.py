@@ -0,0 +1,67 @@
+"""Cheap local triage that spots boilerplate clauses before they reach K2.
+
+Counterparts, severability, captions and similar mechanical sections are
+almost always low-risk, and a 5-15s K2 call adds nothing for them. The
+heading decides whether a clause looks like boilerplate; only truly inert
+sections qualify (amendments, notices, waivers and the like often carry
+real risk and always get the full analysis). Risk markers anywhere in the
+text (indemnities, liability caps, unilateral changes, waivers, ...) then
+lower the confidence, so a "Severability" section that hides a penalty
+still gets analyzed.
+"""
+
+import re
+
+# Headings of sections that are routine in virtually every contract
+_BOILERPLATE_HEADING_RE = re.compile(
+    r"\b("
+    r"counterparts?|headings?|captions?|severab\w*|"
+    r"electronic signatures?|further assurances?"
+    r")\b"
+)
+
+# Terms that make a clause worth a real look no matter what it is called
+_RISK_MARKER_RE = re.compile(
+    r"indemnif|liabilit|liquidated|penalt|terminat|non-?compete|non-?solicit|"
+    r"exclusiv|automatic(?:ally)? renew|auto-renew|irrevocabl|perpetual|"
+    r"arbitrat|jury|class action|assignment|\bfees?\b|interest at|late charge|"
+    r"confidential|intellectual property|royalt|warrant|"
+    # Unilateral changes and waived rights or notice
+    r"sole discretion|unilateral|amend|modif|at any time|without (?:prior )?notice|"
+    r"waive|waiver|forfeit|notice of default"
+)
+
+LONG_CLAUSE_CHARS = 1500  # Longer "boilerplate" sections earn less trust
+
+_BASE_CONFIDENCE = 0.95
+_MARKER_PENALTY = 0.3
+_LONG_CLAUSE_PENALTY = 0.1
+
+
+def predict_low_risk(heading: str, text: str) -> tuple[bool, float]:
+    """Guess whether a clause is routine boilerplate.
+
+    Args:
+        heading: The clause heading / type.
+        text: The clause text.
+
+    Returns:
+        Tuple of (is_low_risk, confidence), confidence in [0, 1].
+    """
+    if not _BOILERPLATE_HEADING_RE.search(heading.lower()):
+        return False, 0.0
+
+    confidence = _BASE_CONFIDENCE
+    # Whole clause: clauses are capped at 3000 chars upstream
+    markers = set(_RISK_MARKER_RE.findall(text.lower()))
+    confidence -= _MARKER_PENALTY * len(markers)
+    if len(text) > LONG_CLAUSE_CHARS:
+        confidence -= _LONG_CLAUSE_PENALTY
+
+    confidence = max(confidence, 0.0)
+    return confidence >= 0.5, confidence
+
+
+def has_risk_markers(text: str) -> bool:
+    """Whether text mentions any term that warrants a full analysis."""
+    return _RISK_MARKER_RE.search(text.lower()) is not None
@@ -20,6 +20,55 @@ HEADERS = {
     "Content-Type": "application/json",
 }
 
+# One pooled client for every RAG query, so each clause reuses a warm
+# keep-alive connection instead of paying a fresh TCP+TLS handshake.
+_http = httpx.AsyncClient(
+    timeout=30,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+
+
+async def aclose() -> None:
+    """Close the shared RAG HTTP client (call on shutdown)."""
+    await _http.aclose()
+
+
+async def fetch_legal_knowledge(clause_text: str, clause_type: str) -> str:
+    """Query Vultr RAG, raising on transport or response-shape errors.
+
+    Args:
+        clause_text: The clause text to research.
+        clause_type: Type of clause (e.g., "non-compete").
+
+    Returns:
+        Legal context string from the knowledge base.
+
+    Raises:
+        httpx.HTTPError: The request failed or returned an error status.
+        KeyError: The response did not contain a completion.
+    """
+    response = await _http.post(
+        f"{VULTR_BASE}/chat/completions/RAG",
+        headers=HEADERS,
+        json={
+            "collection": COLLECTION_ID,
+            "model": "kimi-k2-instruct",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": (
+                        f"Find relevant legal standards, typical language, and risk "
+                        f"indicators for this {clause_type} clause:\n\n{clause_text}"
+                    ),
+                }
+            ],
+            "max_tokens": 1024,
+        },
+    )
+    response.raise_for_status()
+    data = response.json()
+    return data["choices"][0]["message"]["content"]
+
 
 async def query_legal_knowledge(clause_text: str, clause_type: str) -> str:
     """Query Vultr RAG for relevant legal standards and precedent.
@@ -29,33 +78,12 @@ async def query_legal_knowledge(clause_text: str, clause_type: str) -> str:
         clause_type: Type of clause (e.g., "non-compete").
 
     Returns:
-        Legal context string from the knowledge base.
+        Legal context string from the knowledge base (or an error message).
     """
     if not VULTR_API_KEY or not COLLECTION_ID:
         return "Legal knowledge base not configured."
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            response = await client.post(
-                f"{VULTR_BASE}/chat/completions/RAG",
-                headers=HEADERS,
-                json={
-                    "collection": COLLECTION_ID,
-                    "model": "kimi-k2-instruct",
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": (
-                                f"Find relevant legal standards, typical language, and risk "
-                                f"indicators for this {clause_type} clause:\n\n{clause_text}"
-                            ),
-                        }
-                    ],
-                    "max_tokens": 1024,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
-        except (httpx.HTTPError, KeyError) as e:
-            return f"RAG query failed: {e}"
+    try:
+        return await fetch_legal_knowledge(clause_text, clause_type)
+    except (httpx.HTTPError, KeyError) as e:
+        return f"RAG query failed: {e}"
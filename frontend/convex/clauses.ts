@@ -19,25 +19,49 @@ export const getByReview = query({
   },
 });
 
+const clauseFields = {
+  clauseText: v.string(),
+  clauseType: v.optional(v.string()),
+  riskLevel: v.string(),
+  riskCategory: v.string(),
+  explanation: v.string(),
+  concern: v.optional(v.string()),
+  suggestion: v.optional(v.string()),
+  k2Reasoning: v.optional(v.string()),
+  pageNumber: v.optional(v.number()),
+  rects: v.optional(v.string()),
+  pageWidth: v.optional(v.number()),
+  pageHeight: v.optional(v.number()),
+  parentHeading: v.optional(v.string()),
+  subClauseIndex: v.optional(v.number()),
+};
+
 export const addClause = mutation({
   args: {
     reviewId: v.id("reviews"),
-    clauseText: v.string(),
-    clauseType: v.optional(v.string()),
-    riskLevel: v.string(),
-    riskCategory: v.string(),
-    explanation: v.string(),
-    concern: v.optional(v.string()),
-    suggestion: v.optional(v.string()),
-    k2Reasoning: v.optional(v.string()),
-    pageNumber: v.optional(v.number()),
-    rects: v.optional(v.string()),
-    pageWidth: v.optional(v.number()),
-    pageHeight: v.optional(v.number()),
-    parentHeading: v.optional(v.string()),
-    subClauseIndex: v.optional(v.number()),
+    ...clauseFields,
   },
   handler: async (ctx, args) => {
     return await ctx.db.insert("clauses", args);
   },
 });
+
+// Insert several analyzed clauses (and update review progress) in one
+// transaction, so the backend makes one round trip per batch.
+export const addClauseBatch = mutation({
+  args: {
+    reviewId: v.id("reviews"),
+    clauses: v.array(v.object(clauseFields)),
+    completedClauses: v.optional(v.number()),
+  },
+  handler: async (ctx, args) => {
+    for (const clause of args.clauses) {
+      await ctx.db.insert("clauses", { reviewId: args.reviewId, ...clause });
+    }
+    if (args.completedClauses !== undefined) {
+      await ctx.db.patch(args.reviewId, {
+        completedClauses: args.completedClauses,
+      });
+    }
+  },
+});